@@ -0,0 +1,150 @@
+__doc__ = """Vectorized Hamming distances between sets of genotypes.
+
+Genotypes are given as 2D arrays with one row per genotype. Two encodings
+are supported:
+
+integer-coded : (n, length) array
+    e.g. `GenotypePhenotypeMap.state_matrix` or
+    `utils.genotypes_to_array`. The distance is the number of sites that
+    differ.
+
+packed : (n, n_words) array of uint64 (``packed=True``)
+    e.g. `GenotypePhenotypeMap.packed_binary`. The distance is the number of
+    bits that differ (XOR + popcount). For maps with more than two letters
+    at a site, this counts a change between two mutant letters as 2.
+
+Many-to-many distances are computed in blocks of `block_size` x
+`block_size` genotypes to bound memory.
+"""
+
+import numpy as np
+
+from gpmap.utils import popcount
+
+
+def _kernel(X, Y, packed=False):
+    """Distances between every row of X and every row of Y."""
+    if packed:
+        return popcount(X[:, None, :] ^ Y[None, :, :]).sum(axis=-1)
+    return (X[:, None, :] != Y[None, :, :]).sum(axis=-1)
+
+
+def _as_matrix(X, packed=False):
+    """Convert input to a 2D array with one genotype per row."""
+    X = np.asarray(X, dtype=np.uint64 if packed else None)
+    if X.ndim == 1:
+        X = X[None, :]
+    return X
+
+
+def hamming_to_many(x, Y, packed=False):
+    """Hamming distance from one genotype to each genotype in Y.
+
+    Parameters
+    ----------
+    x : array-like, shape (width,)
+        encoded genotype.
+    Y : array-like, shape (n, width)
+        encoded genotypes.
+    packed : bool (default=False)
+        if True, rows are packed binary words.
+
+    Returns
+    -------
+    distances : numpy.ndarray, shape (n,)
+    """
+    x = np.asarray(x, dtype=np.uint64 if packed else None)
+    Y = _as_matrix(Y, packed=packed)
+    if packed:
+        return popcount(Y ^ x).sum(axis=-1)
+    return (Y != x).sum(axis=-1)
+
+
+def iter_hamming_blocks(X, Y, packed=False, block_size=1024):
+    """Iterate over blocks of the distance matrix between X and Y.
+
+    Yields
+    ------
+    (i, j, block) :
+        block holds the distances between X[i:i+block_size] and
+        Y[j:j+block_size].
+    """
+    X = _as_matrix(X, packed=packed)
+    Y = _as_matrix(Y, packed=packed)
+    for i in range(0, len(X), block_size):
+        for j in range(0, len(Y), block_size):
+            block = _kernel(X[i:i + block_size], Y[j:j + block_size],
+                            packed=packed)
+            yield i, j, block
+
+
+def hamming_cdist(X, Y, packed=False, block_size=1024):
+    """Hamming distances between each pair of genotypes in X and Y.
+
+    Returns
+    -------
+    distances : numpy.ndarray, shape (len(X), len(Y))
+    """
+    X = _as_matrix(X, packed=packed)
+    Y = _as_matrix(Y, packed=packed)
+    distances = np.empty((len(X), len(Y)), dtype=np.int64)
+    for i, j, block in iter_hamming_blocks(X, Y, packed=packed,
+                                           block_size=block_size):
+        distances[i:i + block.shape[0], j:j + block.shape[1]] = block
+    return distances
+
+
+def _iter_upper_blocks(X, packed=False, block_size=1024):
+    """Iterate over blocks of the upper triangle of the pairwise distance
+    matrix of X, yielding (rows, columns, distances) as flat arrays.
+    """
+    n = len(X)
+    for i in range(0, n, block_size):
+        for j in range(i, n, block_size):
+            block = _kernel(X[i:i + block_size], X[j:j + block_size],
+                            packed=packed)
+            if i == j:
+                # Only keep pairs above the diagonal.
+                r, c = np.triu_indices(block.shape[0], k=1, m=block.shape[1])
+            else:
+                r, c = np.indices(block.shape).reshape(2, -1)
+            yield r + i, c + j, block[r, c]
+
+
+def hamming_pdist(X, packed=False, block_size=1024):
+    """Condensed pairwise Hamming distances between genotypes in X, in the
+    same order as `scipy.spatial.distance.pdist`.
+
+    Returns
+    -------
+    distances : numpy.ndarray, shape (n * (n - 1) / 2,)
+    """
+    X = _as_matrix(X, packed=packed)
+    n = len(X)
+    distances = np.empty(n * (n - 1) // 2, dtype=np.int64)
+    for rows, columns, values in _iter_upper_blocks(X, packed=packed,
+                                                    block_size=block_size):
+        # Position of (row, column) in the condensed matrix.
+        index = rows * n - rows * (rows + 1) // 2 + (columns - rows - 1)
+        distances[index] = values
+    return distances
+
+
+def hamming_counts(X, packed=False, block_size=1024):
+    """Distribution of pairwise Hamming distances between genotypes in X,
+    computed block by block without storing the distances.
+
+    Returns
+    -------
+    counts : numpy.ndarray
+        counts[d] is the number of pairs of genotypes at distance d.
+    """
+    X = _as_matrix(X, packed=packed)
+    counts = np.zeros(1, dtype=np.int64)
+    for _, _, values in _iter_upper_blocks(X, packed=packed,
+                                           block_size=block_size):
+        block_counts = np.bincount(values)
+        if len(block_counts) > len(counts):
+            counts = np.pad(counts, (0, len(block_counts) - len(counts)))
+        counts[:len(block_counts)] += block_counts
+    return counts
@@ -5,10 +5,12 @@
 # Outside imports
 # ----------------------------------------------------------
 
+import os
 import json
 import pickle
 import numpy as np
 import pandas as pd
+import scipy.sparse
 
 # ----------------------------------------------------------
 # Local imports
@@ -17,6 +19,32 @@ import pandas as pd
 # import different maps into this module
 import gpmap.utils as utils
 import gpmap.errors as errors
+from gpmap.space import GenotypeSpace
+
+
+def _per_site(encoding_table, name):
+    """Value of a column of an encoding table (a DataFrame or structured
+    array) in the first row of each site, in site order.
+    """
+    sites = np.asarray(encoding_table["genotype_index"], dtype=np.int64)
+    _, first = np.unique(sites, return_index=True)
+    return np.asarray(encoding_table[name])[first]
+
+
+def _shared_encoding(wildtype, mutations, site_labels, encoding_table=None):
+    """The cached encoding array (see `utils.get_encoding_array`) if
+    `encoding_table` is None or matches it; otherwise, `encoding_table` as a
+    structured array.
+    """
+    cached = utils.get_encoding_array(wildtype, mutations, site_labels)
+    if encoding_table is None:
+        return cached
+
+    encoding_table = utils.encoding_table_to_array(encoding_table)
+    if encoding_table.dtype == cached.dtype and \
+            np.array_equal(encoding_table, cached):
+        return cached
+    return encoding_table
 
 
 class GenotypePhenotypeMap(object):
@@ -50,11 +78,26 @@ class GenotypePhenotypeMap(object):
     include_binary : bool (default=True)
         Construct a binary representation of the space.
 
+    packed : bool (default=False)
+        Store the binary representation as packed 64-bit words (see
+        `packed_binary`) instead of a column of strings in `data`. The
+        strings are still available from `binary`, but are built on demand.
+
+    genotype_dtype : str (optional)
+        How to store genotypes. By default, they are a column of strings in
+        `data`. 'bytes' keeps them in a fixed-width numpy bytes array (dtype
+        'S{length}') outside of the DataFrame; `genotypes` returns this array
+        and `data` decodes it into a column of strings when first accessed.
+        Any other value (e.g. 'category' or 'string[pyarrow]') is used as the
+        dtype of the genotypes column in `data`.
+
     Attributes
     ----------
     data : pandas.DataFrame
         The core data object. Columns are 'genotypes', 'phenotypes',
-        'n_replicates', 'stdeviations', and (option) 'binary'.
+        'n_replicates', 'stdeviations', and (option) 'binary'. Columns are
+        kept as numpy arrays until this DataFrame is first accessed; after
+        that, it holds the map's data.
 
     complete_data : pandas.DataFrame (optional, created by BinaryMap)
         A dataframe mapping the complete set of genotypes possible, given
@@ -69,9 +112,24 @@ class GenotypePhenotypeMap(object):
         object that gives you (the user) access to the binary representation
         of the map.
 
+    packed_binary : numpy.ndarray
+        binary representation packed into an (n, n_words) array of uint64.
+
+    state_matrix : numpy.ndarray
+        genotypes as an (n, length) array of integer states, i.e. the index of
+        each letter in its site's alphabet in `mutations`. Built lazily and
+        cached until `data` is replaced.
+
     encoding_table:
         Pandas DataFrame showing how mutations map to binary representation.
+        Maps with the same wildtype, mutations and site labels share one
+        read-only table (see `utils.get_encoding_array`); the DataFrame is
+        built from it, per map, when first accessed.
     """
+    # Attributes of subclasses that hold one value per row (along their last
+    # axis), e.g. cached simulation arrays. `subset` slices them.
+    _row_attributes = ()
+
     def __init__(self, wildtype,
                  genotypes,
                  phenotypes=None,
@@ -79,41 +137,20 @@ class GenotypePhenotypeMap(object):
                  mutations=None,
                  site_labels=None,
                  n_replicates=1,
+                 packed=False,
+                 genotype_dtype=None,
                  **kwargs):
 
-        # Assign dummy phenotypes
-        if phenotypes is None:
-            phenotypes = np.zeros(len(genotypes),dtype=np.float64)
-            phenotypes[:] = np.nan
-
         # Set mutations; if not given, assume binary space.
-        if mutations is not None:
-            # Make sure the keys in the mutations dict are integers, not
-            # strings.
-            self._mutations = dict([(int(key), val)
-                                   for key, val in mutations.items()])
-        else:
+        if mutations is None:
             # Get mutations dict from genotypes.
             mutations = utils.genotypes_to_mutations(genotypes)
-            self._mutations = mutations
-
-        # Leftover kwargs become metadata that is ignored.
-        self.metadata = kwargs
 
-        # Set wildtype.
-        self._wildtype = wildtype
-
-        # Store data in DataFrame
-        data = dict(
-            genotypes=genotypes,
-            phenotypes=phenotypes,
-            n_replicates=n_replicates,
-            stdeviations=stdeviations
-        )
-        self.data = pd.DataFrame(data)
+        self._setup(wildtype, genotypes, phenotypes, stdeviations, mutations,
+                    n_replicates, packed, genotype_dtype, kwargs)
 
         # Construct a lookup table for all mutations.
-        self.encoding_table = utils.get_encoding_table(
+        self.encoding_table = utils.get_encoding_array(
             self.wildtype,
             self.mutations,
             site_labels
@@ -128,6 +165,136 @@ class GenotypePhenotypeMap(object):
         # Construct the error maps
         self._add_error()
 
+    def _setup(self, wildtype, genotypes, phenotypes, stdeviations, mutations,
+               n_replicates, packed, genotype_dtype, metadata):
+        """Set the attributes shared by all constructors: everything except
+        the encoding table and the arrays derived from it.
+        """
+        # Assign dummy phenotypes
+        if phenotypes is None:
+            phenotypes = np.zeros(len(genotypes),dtype=np.float64)
+            phenotypes[:] = np.nan
+
+        # Make sure the keys in the mutations dict are integers, not strings.
+        self._mutations = dict([(int(key), val)
+                               for key, val in mutations.items()])
+
+        # Leftover kwargs become metadata that is ignored.
+        self.metadata = metadata
+
+        # Arrays derived from the genotypes, built on demand.
+        self._data = None
+        self._cache = {}
+
+        # Set wildtype.
+        self._wildtype = wildtype
+
+        # Set how the binary representation is stored.
+        self._packed = packed
+
+        # Set how genotypes are stored.
+        self._genotype_dtype = genotype_dtype
+
+        # Store data as numpy arrays; the DataFrame is built on demand.
+        self._genotypes = self._store_genotypes(genotypes)
+        n = len(self._genotypes)
+        self._columns = {}
+        self._set_column("phenotypes", phenotypes)
+        self._set_column("n_replicates", n_replicates)
+        self._set_column("stdeviations", np.full(n, None, dtype=object)
+                         if stdeviations is None else stdeviations)
+
+    def __getstate__(self):
+        """Compact state for pickling.
+
+        The state holds typed numpy arrays (columns, fixed-width genotypes
+        and the packed binary representation) and plain attributes, including
+        those of subclasses. The DataFrame, error maps and binary strings are
+        left out and rebuilt when needed, as is the encoding table unless it
+        was changed. With pickle protocol 5, the arrays can be sent as
+        out-of-band buffers.
+        """
+        state = dict(self.__dict__)
+        for name in ["_data", "_cache_dict", "_cache_key", "std", "err",
+                     "_encoding"]:
+            state.pop(name, None)
+
+        if self._data is not None:
+            columns = dict((name, self._data[name].to_numpy())
+                           for name in self._data.columns
+                           if name != "genotypes")
+        else:
+            columns = dict(self._columns)
+        if "binary" in columns:
+            columns["binary"] = None
+        state["_columns"] = columns
+
+        # ASCII strings are sent as fixed-width bytes, a quarter of the size.
+        genotypes = self.genotypes
+        if isinstance(genotypes, np.ndarray) and genotypes.dtype == object:
+            genotypes = genotypes.astype(str)
+        state["_genotypes"] = genotypes
+        if isinstance(genotypes, np.ndarray) and genotypes.dtype.kind == "U":
+            codes = np.ascontiguousarray(genotypes).view(np.uint32)
+            if codes.max(initial=0) < 128:
+                width = genotypes.dtype.itemsize // 4
+                state["_genotypes"] = codes.astype(np.uint8).view(
+                    "S{}".format(width))
+                state["_genotypes_as_str"] = True
+
+        state["_packed_binary"] = self.packed_binary
+        state["_site_labels"] = self._get_site_labels()
+        encoding_table = _shared_encoding(self.wildtype, self.mutations,
+                                          state["_site_labels"],
+                                          self._encoding)
+        if encoding_table is not utils.get_encoding_array(
+                self.wildtype, self.mutations, state["_site_labels"]):
+            state["_encoding"] = encoding_table
+        return state
+
+    def __setstate__(self, state):
+        """Restore a map from the state given by `__getstate__`."""
+        if "_packed_binary" not in state and "data" in state:
+            self._setstate_legacy(state)
+            return
+
+        state = dict(state)
+        packed_binary = state.pop("_packed_binary")
+        site_labels = state.pop("_site_labels")
+        encoding_table = state.pop("_encoding", None)
+        if state.pop("_genotypes_as_str", False):
+            genotypes = state["_genotypes"]
+            state["_genotypes"] = genotypes.view(np.uint8).astype(
+                np.uint32).view("U{}".format(genotypes.dtype.itemsize))
+        self.__dict__.update(state)
+
+        self._data = None
+        self._cache = {"packed_binary": packed_binary}
+        self.encoding_table = _shared_encoding(self.wildtype, self.mutations,
+                                               site_labels, encoding_table)
+        self._add_error()
+
+    def _setstate_legacy(self, state):
+        """Restore a map pickled by older versions, whose state is its
+        attributes, including the `data` DataFrame and encoding table.
+        """
+        state = dict(state)
+        data = state.pop("data")
+        encoding_table = state.pop("encoding_table", None)
+        for name in ["std", "err"]:
+            state.pop(name, None)
+        self.__dict__.update(state)
+
+        self._setup(self._wildtype, data["genotypes"], None, None,
+                    self._mutations, 1, False, None, self.metadata)
+        self.data = data
+        site_labels = None
+        if encoding_table is not None:
+            site_labels = _per_site(encoding_table, "site_label")
+        self.encoding_table = _shared_encoding(self.wildtype, self.mutations,
+                                               site_labels, encoding_table)
+        self._add_error()
+
     def _repr_html_(self):
         """Represent the GenotypePhenotypeMap as an html table."""
         return self.data.to_html()
@@ -136,6 +303,158 @@ class GenotypePhenotypeMap(object):
         """Dictionary that maps attr1 to attr2."""
         return dict(zip(getattr(self, attr1), getattr(self, attr2)))
 
+    @classmethod
+    def from_arrays(cls, wildtype, genotypes, mutations,
+                    phenotypes=None,
+                    stdeviations=None,
+                    n_replicates=1,
+                    encoding_table=None,
+                    site_labels=None,
+                    binary=None,
+                    packed_binary=None,
+                    n_mutations=None,
+                    packed=False,
+                    genotype_dtype=None,
+                    validate=True,
+                    **kwargs):
+        """Construct a GenotypePhenotypeMap from precomputed arrays.
+
+        Unlike the constructor, nothing that is given is derived again: the
+        mutations, encoding table, binary representation and number of
+        mutations are used as they are. Anything left out is built as usual.
+
+        Parameters
+        ----------
+        wildtype : str
+            wildtype sequence.
+
+        genotypes : array-like
+            list of all genotypes.
+
+        mutations : dict
+            alphabet at each site.
+
+        encoding_table : pandas.DataFrame or numpy.ndarray (optional)
+            encoding table for `wildtype` and `mutations`, as a DataFrame
+            (see `utils.get_encoding_table`) or structured array (see
+            `utils.get_encoding_array`).
+
+        binary : array-like (optional)
+            binary representation of the genotypes, either as a list of
+            strings or an (n, n_bits) matrix of 0s and 1s.
+
+        packed_binary : numpy.ndarray (optional)
+            binary representation as an (n, n_words) array of uint64 words
+            (see `utils.pack_binary`). Takes precedence over `binary`.
+
+        n_mutations : array-like (optional)
+            number of mutations in each genotype.
+
+        validate : bool (default=True)
+            check that the arrays agree in shape with each other and the
+            mutations, that all genotypes are in the alphabet, and that the
+            binary representation matches the genotypes. Skip this for data
+            that was validated when it was built.
+
+        Other arguments are the same as the constructor's.
+
+        Returns
+        -------
+        gpm : GenotypePhenotypeMap
+        """
+        self = cls.__new__(cls)
+        self._setup(wildtype, genotypes, phenotypes, stdeviations, mutations,
+                    n_replicates, packed, genotype_dtype, kwargs)
+
+        if encoding_table is None:
+            encoding_table = utils.get_encoding_array(self.wildtype,
+                                                      self.mutations,
+                                                      site_labels)
+        self.encoding_table = encoding_table
+
+        # Wire up the binary representation.
+        strings = None
+        if packed_binary is None and binary is not None:
+            binary = np.asarray(binary)
+            if binary.dtype.kind in "OUS":
+                strings = binary
+                binary = utils.binary_to_matrix(binary)
+            if validate and len(binary) and (
+                    binary.shape[1:] != (self.n_bits,) or binary.max() > 1):
+                raise ValueError("binary must have {} bits of 0 or "
+                                 "1.".format(self.n_bits))
+            packed_binary = utils.pack_binary(binary)
+
+        if packed_binary is None:
+            self.add_binary()
+        else:
+            self._cache["packed_binary"] = np.asarray(packed_binary,
+                                                      dtype=np.uint64)
+            if not self._packed:
+                if strings is None:
+                    matrix = utils.unpack_binary(packed_binary, self.n_bits)
+                    strings = utils.matrix_to_binary(matrix)
+                self._set_column("binary", strings)
+
+        if n_mutations is None:
+            self.add_n_mutations()
+        else:
+            self._set_column("n_mutations", n_mutations)
+
+        if validate:
+            self._validate()
+
+        # Construct the error maps
+        self._add_error()
+        return self
+
+    def _validate(self):
+        """Check that the map's arrays agree with each other and with the
+        mutations. Raises a ValueError if they don't.
+        """
+        length = len(self.mutations)
+        if len(self.wildtype) != length:
+            raise ValueError("wildtype must be the same length as mutations.")
+
+        sites = np.asarray(self._encoding["genotype_index"], dtype=np.int64)
+        if len(np.unique(sites)) != length:
+            raise ValueError("encoding_table does not match mutations.")
+
+        # Raises if any genotype has the wrong length or an unknown letter.
+        states = self.state_matrix
+        if states.shape[1] != length:
+            raise ValueError("Genotypes must be the same length as mutations.")
+
+        n_words = -(-self.n_bits // 64)
+        packed = self.packed_binary
+        if packed.shape != (self.n, n_words):
+            raise ValueError("packed_binary must have shape {}.".format(
+                (self.n, n_words)))
+
+        # Bits set by each state at each site, from the encoding table.
+        lut = utils.get_encoding_lut(self._encoding)
+        expected = np.zeros_like(packed)
+        for site in range(length):
+            alphabet = self.mutations[site]
+            if alphabet is None:
+                alphabet = [self.wildtype[site]]
+            columns = lut[site, [ord(letter) for letter in alphabet]]
+            if np.any(columns == -2):
+                raise ValueError("encoding_table does not match mutations.")
+            columns = columns[states[:, site]]
+            rows = np.flatnonzero(columns >= 0)
+            columns = columns[rows]
+            expected[rows, columns // 64] |= np.left_shift(
+                np.uint64(1), (63 - columns % 64).astype(np.uint64))
+        if not np.array_equal(packed, expected):
+            raise ValueError("The binary representation does not match the "
+                             "genotypes.")
+
+        n_mutations = utils.popcount(packed).sum(axis=1)
+        if not np.array_equal(n_mutations, self.n_mutations):
+            raise ValueError("n_mutations does not match the binary "
+                             "representation.")
+
     @classmethod
     def read_dataframe(cls, dataframe, wildtype, **kwargs):
         """Construct a GenotypePhenotypeMap from a dataframe."""
@@ -162,8 +481,157 @@ class GenotypePhenotypeMap(object):
         return self
 
     @classmethod
-    def read_csv(cls, fname, wildtype, **kwargs):
-        """"""
+    def _load_arrays(cls, header, arrays, encoding_table=None,
+                     validate=False):
+        """Construct a map from the header and arrays written by
+        `_dump_arrays`, and the encoding table stored with them (as a
+        structured array), if any.
+        """
+        wildtype = header["wildtype"]
+        mutations = dict((int(site), alphabet)
+                         for site, alphabet in header["mutations"].items())
+
+        # Share the cached table unless the stored one differs from it.
+        encoding_table = _shared_encoding(wildtype, mutations,
+                                          header["site_labels"],
+                                          encoding_table)
+
+        genotypes = arrays["genotypes"]
+        genotype_dtype = header["genotype_dtype"]
+        if genotype_dtype != "bytes":
+            genotypes = genotypes.astype(str)
+
+        return cls.from_arrays(wildtype, genotypes, mutations,
+                               phenotypes=arrays["phenotypes"],
+                               stdeviations=arrays.get("stdeviations"),
+                               n_replicates=arrays["n_replicates"],
+                               encoding_table=encoding_table,
+                               packed_binary=arrays["packed_binary"],
+                               n_mutations=arrays["n_mutations"],
+                               packed=header["packed"],
+                               genotype_dtype=genotype_dtype,
+                               validate=validate,
+                               **header["metadata"])
+
+    @classmethod
+    def read_npz(cls, filename, validate=False):
+        """Read a GenotypePhenotypeMap written by `to_npz`. Nothing is
+        derived from the genotypes again.
+
+        Parameters
+        ----------
+        filename : str
+            Name of file to read.
+
+        validate : bool (default=False)
+            check the arrays agree with each other (see `from_arrays`).
+        """
+        with np.load(filename, allow_pickle=False) as f:
+            header = json.loads(str(f["header"]))
+            arrays = dict((name, f[name]) for name in f.files
+                          if name not in ("header", "encoding_table"))
+            encoding_table = None
+            if "encoding_table" in f.files:
+                encoding_table = f["encoding_table"]
+                encoding_table.flags.writeable = False
+        return cls._load_arrays(header, arrays, encoding_table=encoding_table,
+                                validate=validate)
+
+    @classmethod
+    def read_parquet(cls, filename, validate=False):
+        """Read a GenotypePhenotypeMap written by `to_parquet`. Requires
+        pyarrow.
+
+        Parameters
+        ----------
+        filename : str
+            Name of file to read.
+
+        validate : bool (default=False)
+            check the arrays agree with each other (see `from_arrays`).
+        """
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(filename)
+        header = json.loads(table.schema.metadata[b"gpmap"])
+
+        # Fixed-width genotypes are read straight from the Arrow buffer.
+        column = table.column("genotypes").combine_chunks()
+        width = column.type.byte_width
+        genotypes = np.frombuffer(column.buffers()[1], dtype="S{}".format(width),
+                                  count=len(column), offset=column.offset)
+
+        arrays = dict(genotypes=genotypes)
+        for name in table.column_names:
+            if name != "genotypes" and not name.startswith("packed_binary"):
+                arrays[name] = table.column(name).to_numpy()
+        words = [name for name in table.column_names
+                 if name.startswith("packed_binary")]
+        words.sort(key=lambda name: int(name.split("_")[-1]))
+        packed_binary = np.empty((table.num_rows, len(words)), dtype=np.uint64)
+        for word, name in enumerate(words):
+            packed_binary[:, word] = table.column(name).to_numpy()
+        arrays["packed_binary"] = packed_binary
+        return cls._load_arrays(header, arrays, validate=validate)
+
+    @classmethod
+    def open_mmap(cls, path, mode="r", validate=False):
+        """Open a GenotypePhenotypeMap written by `to_mmap`, with its arrays
+        memory-mapped from disk.
+
+        Nothing is read until it is used, so maps larger than memory can be
+        opened, and processes that open the same map share its pages. The
+        genotypes are kept as fixed-width bytes and the binary
+        representation is kept packed (see the `genotype_dtype` and `packed`
+        arguments of the constructor). Accessing `data` or `binary` still
+        builds them in memory.
+
+        Parameters
+        ----------
+        path : str
+            directory written by `to_mmap`.
+
+        mode : str (default='r')
+            mode for `numpy.memmap`. 'r' is read-only; 'r+' writes changes to
+            arrays (e.g. `gpm.phenotypes[0] = 1`) back to disk; 'c' keeps
+            changes in memory.
+
+        validate : bool (default=False)
+            check the arrays agree with each other (see `from_arrays`). This
+            reads all of the genotypes.
+        """
+        with open(os.path.join(path, "header.json"), "r") as f:
+            header = json.load(f)
+        encoding_table = header.pop("encoding_table", None)
+        if encoding_table is not None:
+            encoding_table = utils.encoding_table_to_array(
+                pd.DataFrame(encoding_table))
+        header["genotype_dtype"] = "bytes"
+        header["packed"] = True
+
+        arrays = {}
+        for name in os.listdir(path):
+            stem, ext = os.path.splitext(name)
+            if ext == ".npy":
+                arrays[stem] = np.load(os.path.join(path, name),
+                                       mmap_mode=mode)
+        return cls._load_arrays(header, arrays, encoding_table=encoding_table,
+                                validate=validate)
+
+    @classmethod
+    def read_csv(cls, fname, wildtype, chunksize=None, **kwargs):
+        """Read a GenotypePhenotypeMap from a csv file with 'genotypes' and
+        'phenotypes' columns, and optional 'stdeviations' and 'n_replicates'
+        columns.
+
+        If `chunksize` is given, the file is read that many rows at a time
+        and each chunk is encoded into compact arrays before the next is read
+        (see `_read_csv_chunks`), so the whole file is never held as text.
+        Keyword arguments are passed to the constructor.
+        """
+        if chunksize is not None:
+            return cls._read_csv_chunks(fname, wildtype, chunksize, **kwargs)
+
         dtypes = dict(
             genotypes=str,
             phenotypes=float,
@@ -174,6 +642,156 @@ class GenotypePhenotypeMap(object):
         self = cls.read_dataframe(df, wildtype, **kwargs)
         return self
 
+    @classmethod
+    def _read_csv_chunks(cls, fname, wildtype, chunksize, **kwargs):
+        """Read a csv file in chunks (see `read_csv` and `_read_chunks`)."""
+        dtypes = dict(
+            genotypes=str,
+            phenotypes=float,
+            stdeviations=float,
+            n_replicates=int
+        )
+        chunks = pd.read_csv(fname, dtype=dtypes, chunksize=chunksize)
+        return cls._read_chunks(wildtype, chunks, chunksize, **kwargs)
+
+    @classmethod
+    def _read_chunks(cls, wildtype, chunks, chunksize, mutations=None,
+                     site_labels=None, genotype_dtype=None, **kwargs):
+        """Build a map from chunks of rows, each a DataFrame or dictionary
+        with 'genotypes' and 'phenotypes', and optional 'stdeviations' and
+        'n_replicates' columns.
+
+        Genotypes are kept as fixed-width bytes while reading. If `mutations`
+        is given, each chunk is encoded as it is read; otherwise, the letters
+        seen at each site are tracked and the genotypes are encoded (in
+        chunks) once all chunks are read. Use genotype_dtype='bytes' and
+        packed=True for the most compact map.
+        """
+        length = len(wildtype)
+        encoding_table = None
+        if mutations is not None:
+            encoding_table = utils.get_encoding_array(wildtype, mutations,
+                                                      site_labels)
+
+        # Letters seen at each site.
+        seen = np.zeros((length, 256), dtype=bool)
+
+        columns = dict(genotypes=[], phenotypes=[], stdeviations=[],
+                       n_replicates=[], packed_binary=[])
+        n_chunks = 0
+        for chunk in chunks:
+            n_chunks += 1
+            arr = utils.genotypes_to_array(np.asarray(chunk["genotypes"]))
+            if arr.shape[1] != length:
+                raise ValueError("Genotypes must be the same length as the "
+                                 "wildtype.")
+            genotypes = arr.view("S{}".format(length)).ravel()
+            columns["genotypes"].append(genotypes)
+            for name, dtype in [("phenotypes", np.float64),
+                                ("stdeviations", np.float64),
+                                ("n_replicates", np.int64)]:
+                if name in chunk:
+                    values = np.asarray(chunk[name], dtype=dtype)
+                    columns[name].append(values)
+
+            if encoding_table is None:
+                seen[np.arange(length), arr] = True
+            else:
+                matrix = utils.genotypes_to_binary_matrix(genotypes,
+                                                          encoding_table)
+                columns["packed_binary"].append(utils.pack_binary(matrix))
+
+        def concatenate(name):
+            if n_chunks == 0 or len(columns[name]) != n_chunks:
+                return None
+            return np.concatenate(columns[name])
+
+        genotypes = concatenate("genotypes")
+        if genotypes is None:
+            genotypes = np.zeros(0, dtype="S{}".format(length))
+
+        # Encode once the alphabet at each site is known.
+        if encoding_table is None:
+            mutations = dict((site, [chr(c) for c in np.flatnonzero(letters)])
+                             for site, letters in enumerate(seen))
+            encoding_table = utils.get_encoding_array(wildtype, mutations,
+                                                      site_labels)
+            for start in range(0, len(genotypes), chunksize):
+                matrix = utils.genotypes_to_binary_matrix(
+                    genotypes[start:start + chunksize], encoding_table)
+                columns["packed_binary"].append(utils.pack_binary(matrix))
+        packed_binary = concatenate("packed_binary")
+
+        if genotype_dtype != "bytes":
+            genotypes = genotypes.astype(str)
+
+        n_replicates = concatenate("n_replicates")
+        return cls.from_arrays(wildtype, genotypes, mutations,
+                               phenotypes=concatenate("phenotypes"),
+                               stdeviations=concatenate("stdeviations"),
+                               n_replicates=1 if n_replicates is None
+                               else n_replicates,
+                               encoding_table=encoding_table,
+                               packed_binary=packed_binary,
+                               genotype_dtype=genotype_dtype,
+                               validate=False,
+                               **kwargs)
+
+    @classmethod
+    def read_jsonl(cls, filename, chunksize=2**16, **kwargs):
+        """Read a GenotypePhenotypeMap from a JSON-Lines file written by
+        `to_jsonl`.
+
+        The file is read one line at a time, and records are encoded into
+        compact arrays `chunksize` at a time (see `_read_chunks`), so the
+        whole document is never held in memory. Keyword arguments override
+        the header and are passed to the constructor.
+        """
+        with open(filename, "r") as f:
+            header = json.loads(f.readline())
+            options = dict(mutations=header["mutations"],
+                           site_labels=header.get("site_labels"))
+            options.update(header.get("metadata", {}))
+            options.update(kwargs)
+            wildtype = options.pop("wildtype", header["wildtype"])
+            return cls._read_chunks(wildtype, cls._iter_jsonl(f, chunksize),
+                                    chunksize, **options)
+
+    @staticmethod
+    def _iter_jsonl(f, chunksize):
+        """Group the records in an open JSON-Lines file into chunks of
+        columns. A line is either one row or a chunk of rows written as lists.
+        """
+        names = ["genotypes", "phenotypes", "stdeviations", "n_replicates"]
+        chunk = dict((name, []) for name in names)
+        size = 0
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows = isinstance(record["genotypes"], list)
+            for name in names:
+                if name not in record:
+                    continue
+                value = record[name]
+                if name == "stdeviations":
+                    value = np.nan if value is None else value
+                    if rows:
+                        value = [np.nan if x is None else x for x in value]
+                if rows:
+                    chunk[name].extend(value)
+                else:
+                    chunk[name].append(value)
+            size += len(record["genotypes"]) if rows else 1
+            if size >= chunksize:
+                yield dict((name, values) for name, values in chunk.items()
+                           if len(values) == size)
+                chunk = dict((name, []) for name in names)
+                size = 0
+        if size > 0:
+            yield dict((name, values) for name, values in chunk.items()
+                       if len(values) == size)
+
     @classmethod
     def read_excel(cls, fname, wildtype, **kwargs):
         """"""
@@ -200,38 +818,67 @@ class GenotypePhenotypeMap(object):
         with open(filename, "r") as f:
             metadata = json.load(f)
 
-        return cls.from_dict(metadata)
+        return cls.from_dict(metadata, **kwargs)
 
 
     @classmethod
-    def from_dict(cls, metadata):
-        """"""
+    def from_dict(cls, metadata, **kwargs):
+        """Construct a GenotypePhenotypeMap from a dictionary (see `to_dict`).
+        Keyword arguments are passed to the constructor and override the
+        dictionary.
+
+        The stored mutations, site labels and binary representation are used
+        as they are (see `from_arrays`) and checked against the genotypes,
+        instead of being derived again. Other keys (besides 'data') become
+        metadata.
+        """
         try:
             data = metadata["data"]
         except KeyError:
             data = metadata
 
-        if "wildtype" in metadata:
-            wildtype = metadata["wildtype"]
-            metadata.pop("wildtype")
+        columns = ["genotypes", "phenotypes", "stdeviations", "n_replicates",
+                   "binary", "n_mutations"]
 
         # Check keys in dictionary.
-        if not all(key in data for key in ["genotypes", "phenotypes", "stdeviations", "n_replicates"]):
+        if not all(key in data for key in columns[:4]):
             raise Exception('The "data" field must have the following keys: '
                             'genotypes", "phenotypes", "stdeviations", "n_replicates"')
 
+        options = dict((key, value) for key, value in metadata.items()
+                       if key != "data" and key not in columns)
+        options.update(kwargs)
+        if "wildtype" not in options:
+            raise Exception("A wildtype must be given.")
+        wildtype = options.pop("wildtype")
+
+        # The stored encoding is only valid for the stored wildtype and
+        # mutations.
+        encoded = {}
+        if "wildtype" not in kwargs and "mutations" not in kwargs:
+            for key in ["binary", "n_mutations"]:
+                if key in data:
+                    encoded[key] = data[key]
+
+        mutations = options.pop("mutations", None)
+        if mutations is None:
+            mutations = utils.genotypes_to_mutations(data["genotypes"])
+
         # Create an instance
-        gpm = cls(
+        gpm = cls.from_arrays(
             wildtype,
             data["genotypes"],
-            data["phenotypes"],
+            mutations,
+            phenotypes=data["phenotypes"],
             stdeviations=data["stdeviations"],
-            n_replicates=data["n_replicates"]
+            n_replicates=data["n_replicates"],
+            **encoded,
+            **options
         )
         return gpm
 
     @classmethod
-    def from_json(cls, json_str):
+    def from_json(cls, json_str, **kwargs):
         """Load a genotype-phenotype map directly from a json.
         The JSON metadata must include the following attributes
 
@@ -240,17 +887,134 @@ class GenotypePhenotypeMap(object):
         Keyword arguments override input that is loaded from the JSON file.
         """
         metadata = json.loads(json_str)
-        return cls.from_dict(metadata)
+        return cls.from_dict(metadata, **kwargs)
 
     # ----------------------------------------------------------
     # Writing methods
     # ----------------------------------------------------------
 
+    def _dump_arrays(self):
+        """Describe the map with a JSON-serializable header and a dictionary
+        of typed numpy arrays; see `_load_arrays`.
+
+        Genotypes are stored as fixed-width bytes. Stdeviations are left out
+        if none were given.
+        """
+        genotypes = self.genotypes
+        if self._genotype_dtype != "bytes":
+            arr = utils.genotypes_to_array(genotypes)
+            genotypes = arr.view("S{}".format(arr.shape[1])).ravel()
+
+        arrays = dict(
+            genotypes=genotypes,
+            phenotypes=np.asarray(self.phenotypes, dtype=np.float64),
+            n_replicates=np.asarray(self.n_replicates, dtype=np.int64),
+            n_mutations=np.asarray(self.n_mutations, dtype=np.int64),
+            packed_binary=self.packed_binary,
+        )
+        stdeviations = self.stdeviations
+        if stdeviations.dtype != object or \
+                any(x is not None for x in stdeviations):
+            arrays["stdeviations"] = np.asarray(stdeviations,
+                                                dtype=np.float64)
+
+        header = dict(
+            wildtype=self.wildtype,
+            mutations=self.mutations,
+            site_labels=self._get_site_labels(),
+            packed=self._packed,
+            genotype_dtype=self._genotype_dtype,
+            metadata=self.metadata,
+        )
+        return header, arrays
+
+    def to_npz(self, filename, compressed=False):
+        """Write genotype-phenotype map to a numpy .npz file.
+
+        Genotypes (as fixed-width bytes), phenotypes, stdeviations,
+        n_replicates, n_mutations and the packed binary representation are
+        stored as typed arrays, with the wildtype, mutations, site labels and
+        metadata in a JSON header. The encoding table is stored as a
+        structured array (see `utils.get_encoding_array`) and read back by
+        `read_npz`.
+
+        Parameters
+        ----------
+        filename : str
+            Name of file to write out.
+
+        compressed : bool (default=False)
+            compress the arrays (smaller, but slower to read and write).
+        """
+        header, arrays = self._dump_arrays()
+        encoding_table = utils.encoding_table_to_array(self._encoding)
+        save = np.savez_compressed if compressed else np.savez
+        save(filename, header=np.array(json.dumps(header)),
+             encoding_table=encoding_table, **arrays)
+
+    def to_parquet(self, filename, **kwargs):
+        """Write genotype-phenotype map to an Apache Parquet file. Requires
+        pyarrow.
+
+        The columns are those of `to_npz`, with genotypes as fixed-width
+        binary and one packed_binary_<i> column per 64-bit word. The header is
+        stored in the file's metadata. Keyword arguments are passed to
+        `pyarrow.parquet.write_table`. Read it with `read_parquet`.
+
+        Parameters
+        ----------
+        filename : str
+            Name of file to write out.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        header, arrays = self._dump_arrays()
+        genotypes = arrays.pop("genotypes")
+        packed_binary = arrays.pop("packed_binary")
+
+        columns = dict(genotypes=pa.array(
+            genotypes, type=pa.binary(genotypes.dtype.itemsize)))
+        columns.update(arrays)
+        for word in range(packed_binary.shape[1]):
+            columns["packed_binary_{}".format(word)] = packed_binary[:, word]
+
+        table = pa.table(columns)
+        table = table.replace_schema_metadata(
+            {"gpmap": json.dumps(header)})
+        pq.write_table(table, filename, **kwargs)
+
+    def to_mmap(self, path):
+        """Write genotype-phenotype map to a directory that can be opened with
+        memory-mapped arrays (see `open_mmap`).
+
+        Each array of `to_npz` is written to its own .npy file. The wildtype,
+        mutations, site labels, metadata and encoding table are written to a
+        header.json sidecar.
+
+        Parameters
+        ----------
+        path : str
+            directory to write to. It is created if it doesn't exist.
+        """
+        header, arrays = self._dump_arrays()
+        encoding_table = utils.encoding_table_to_array(self._encoding)
+        header["encoding_table"] = dict(
+            (name, encoding_table[name].tolist())
+            for name in encoding_table.dtype.names)
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        for name, values in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), values)
+        with open(os.path.join(path, "header.json"), "w") as f:
+            json.dump(header, f)
+
     def to_pickle(self, filename, **kwargs):
         """Write GenotypePhenotypeMap object to a pickle file.
         """
         with open(filename, 'wb') as f:
-            pickle.dump(self, f)
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def to_excel(self, filename=None, **kwargs):
         """Write genotype-phenotype map to excel spreadsheet.
@@ -288,11 +1052,68 @@ class GenotypePhenotypeMap(object):
         metadata = {
             "wildtype": self.wildtype,
             "mutations": self.mutations,
+            "site_labels": self._get_site_labels(),
             "data": data
         }
         metadata.update(**self.metadata)
         return metadata
 
+    def to_jsonl(self, filename, chunksize=None, mode="w"):
+        """Write genotype-phenotype map to a JSON-Lines file.
+
+        The first line is a header with the wildtype, mutations, site labels
+        and metadata. Every other line is a record of 'genotypes',
+        'phenotypes', 'stdeviations' and 'n_replicates': one genotype per
+        line, or lists of `chunksize` genotypes per line if `chunksize` is
+        given. Rows are formatted a block at a time, so memory use doesn't
+        grow with the size of the map. Read it with `read_jsonl`.
+
+        Parameters
+        ----------
+        filename : str
+            Name of file to write out.
+
+        chunksize : int (optional)
+            number of genotypes per line.
+
+        mode : str (default='w')
+            'w' to write a new file, or 'a' to append records to a file. The
+            header is only written if the file is empty, so appended maps must
+            have the same wildtype and mutations.
+        """
+        names = ["genotypes", "phenotypes", "stdeviations", "n_replicates"]
+        columns = dict(
+            genotypes=self.genotypes,
+            phenotypes=self.phenotypes,
+            stdeviations=self.stdeviations,
+            n_replicates=self.n_replicates,
+        )
+        block = chunksize or 2**12
+
+        with open(filename, mode) as f:
+            if f.tell() == 0:
+                header = dict(
+                    wildtype=self.wildtype,
+                    mutations=self.mutations,
+                    site_labels=self._get_site_labels(),
+                    metadata=self.metadata,
+                )
+                f.write(json.dumps(header) + "\n")
+
+            for start in range(0, self.n, block):
+                values = {}
+                for name in names:
+                    values[name] = columns[name][start:start + block]
+                    if values[name].dtype.kind == "S":
+                        values[name] = values[name].astype(str)
+                    values[name] = values[name].tolist()
+
+                if chunksize is not None:
+                    f.write(json.dumps(values) + "\n")
+                    continue
+                for row in zip(*[values[name] for name in names]):
+                    f.write(json.dumps(dict(zip(names, row))) + "\n")
+
     def to_json(self, filename=None, complete=False):
         """Write genotype-phenotype map to json file. If no filename is given
         returns
@@ -307,6 +1128,147 @@ class GenotypePhenotypeMap(object):
             with open(filename, "w") as f:
                 json.dump(data, f)
 
+    @property
+    def data(self):
+        """The core DataFrame of the map.
+
+        Once built, it holds the map's data; `genotypes` and the derived
+        arrays (e.g. `packed_binary`) follow in-place edits that add, drop or
+        reorder its rows. Changing single genotype values in place (e.g. with
+        `loc`) isn't detected; set the genotypes column instead.
+        """
+        # Build the DataFrame the first time it's needed.
+        if self._data is None:
+            genotypes = self._genotypes
+            if self._genotype_dtype == "bytes":
+                genotypes = genotypes.astype(str)
+            elif isinstance(genotypes, np.ndarray) and \
+                    not genotypes.flags.writeable:
+                # e.g. shared with another map (see `subset`).
+                genotypes = genotypes.copy()
+            columns = dict(genotypes=genotypes)
+            columns.update(self._fill_columns())
+
+            # From here on, the DataFrame holds all of the map's data. The
+            # derived arrays still match it.
+            cache = self._cache
+            cache["genotypes"] = self._genotypes
+            self._data = pd.DataFrame(columns, copy=False)
+            self._cache = cache
+            self._columns = {}
+            self._genotypes = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        """Set the core DataFrame and drop anything derived from the old one."""
+        self._data = data
+        self._columns = {}
+        self._genotypes = None
+        self._clear_cache()
+
+    def _data_key(self):
+        """Objects that identify the rows of `data`: its index and genotypes
+        column. Editing `data` in place in a way that adds, drops or reorders
+        rows (e.g. `drop` or `sort_values` with inplace=True) or replaces the
+        genotypes column changes them, so derived arrays can be dropped.
+        """
+        if self._data is None:
+            return None
+
+        column = self._data["genotypes"].array
+        if isinstance(column, getattr(pd.arrays, "NumpyExtensionArray",
+                                      getattr(pd.arrays, "PandasArray", ()))):
+            # A new wrapper is made for each access; use its memory instead.
+            column = np.asarray(column).__array_interface__["data"][0]
+        return self._data.index, column, len(self._data)
+
+    @property
+    def _cache(self):
+        """Arrays derived from the genotypes (e.g. `packed_binary`). They are
+        dropped when the rows of `data` change (see `_data_key`).
+        """
+        key = self._data_key()
+        old = self._cache_key
+        if key is None or old is None:
+            same = key is old
+        else:
+            same = all(a is b or (isinstance(a, int) and a == b)
+                       for a, b in zip(key, old))
+        if not same:
+            self._cache_dict = {}
+            self._cache_key = key
+        return self._cache_dict
+
+    @_cache.setter
+    def _cache(self, cache):
+        """Set the derived arrays for the current rows of `data`."""
+        self._cache_dict = cache
+        self._cache_key = self._data_key()
+
+    def _store_genotypes(self, genotypes):
+        """Convert genotypes to the array used to store them (see the
+        `genotype_dtype` argument).
+        """
+        if self._genotype_dtype == "bytes":
+            # Already stored this way, e.g. a memory-mapped array; used as
+            # is. Any genotypes that are too short fail when encoded.
+            dtype = np.dtype("S{}".format(len(self._wildtype)))
+            if getattr(genotypes, "dtype", None) == dtype:
+                return np.asarray(genotypes)
+            arr = utils.genotypes_to_array(genotypes)
+            return arr.view("S{}".format(arr.shape[1])).ravel()
+        elif self._genotype_dtype is not None:
+            return pd.Series(genotypes).astype(self._genotype_dtype).values
+
+        genotypes = np.asarray(genotypes)
+        if genotypes.dtype.kind not in "OUS":
+            genotypes = genotypes.astype(str)
+        return genotypes
+
+    def _has_column(self, name):
+        """Check if the map has a column."""
+        if self._data is not None:
+            return name in self._data
+        return name in self._columns
+
+    def _get_column(self, name):
+        """Get a column of the map as an array, without building `data`."""
+        if self._data is not None:
+            return self._data[name].values
+        if self._columns[name] is None:
+            return self._fill_columns()[name]
+        return self._columns[name]
+
+    def _fill_columns(self):
+        """Build columns that were left out when the map was pickled (see
+        `__getstate__`); they are stored as None until then.
+        """
+        if self._columns.get("binary", False) is None:
+            matrix = utils.unpack_binary(self.packed_binary, self.n_bits)
+            self._columns["binary"] = utils.matrix_to_binary(matrix)
+        return self._columns
+
+    def _set_column(self, name, values):
+        """Set a column of the map, without building `data`."""
+        if self._data is not None:
+            self._data[name] = values
+            return
+
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(self.n, values)
+        elif len(values) != self.n:
+            raise ValueError("{} must be the same length as genotypes.".format(
+                name))
+        self._columns[name] = values
+
+    def _clear_cache(self):
+        """Drop cached arrays derived from the genotypes. They are rebuilt the
+        next time they are requested.
+        """
+        self._cache = {}
+
     @property
     def length(self):
         """Get length of the genotypes. """
@@ -324,9 +1286,80 @@ class GenotypePhenotypeMap(object):
 
     @wildtype.setter
     def wildtype(self, wildtype):
-        """If a wildtype is given after init, rebuild binary genotypes."""
+        """Change the reference genotype. The encoding table is rebuilt and the
+        binary representation is transformed to the new reference, without
+        encoding the genotypes again.
+        """
+        wildtype = str(wildtype)
+        if len(wildtype) != self.length:
+            raise ValueError("wildtype must be the same length as the "
+                             "genotypes.")
+
+        old_wildtype = self._wildtype
+        changed = [site for site in range(self.length)
+                   if wildtype[site] != old_wildtype[site]]
+        for site in changed:
+            alphabet = self.mutations[site]
+            if alphabet is None or wildtype[site] not in alphabet:
+                raise ValueError("{} is not in the alphabet of site {}.".format(
+                    wildtype[site], site))
+
+        old_table = self._encoding
+        old_packed = self.packed_binary
         self._wildtype = wildtype
-        self.add_binary()
+        self.encoding_table = utils.get_encoding_array(
+            self.wildtype,
+            self.mutations,
+            self._get_site_labels()
+        )
+        if not changed:
+            return
+
+        # Sites don't move, and neither do the bits of sites that keep their
+        # wildtype. A site with two letters swaps which letter sets its bit,
+        # which flips the bit for every genotype.
+        start = _per_site(old_table, "binary_index_start").astype(np.int64)
+        flip = np.zeros(old_packed.shape[1] * 64, dtype=np.uint8)
+        reencode = []
+        for site in changed:
+            if len(self.mutations[site]) == 2:
+                flip[start[site]] = 1
+            else:
+                reencode.append(site)
+        packed = old_packed ^ utils.pack_binary(flip[None, :])
+
+        # Other sites get their bits again from their states.
+        if reencode:
+            block = np.zeros_like(flip)
+            for site in reencode:
+                n = len(self.mutations[site]) - 1
+                block[start[site]:start[site] + n] = 1
+            packed &= ~utils.pack_binary(block[None, :])
+
+            # Column set by each state at each site, or -1 if none.
+            lut = utils.get_encoding_lut(self._encoding)
+            state_columns = np.full((len(reencode), 256), -1, dtype=np.int64)
+            for i, site in enumerate(reencode):
+                codes = [ord(letter) for letter in self.mutations[site]]
+                state_columns[i, :len(codes)] = lut[site, codes]
+            states = self.state_matrix[:, reencode]
+
+            # Each site sets at most one bit, so summing bits ORs them.
+            for word in np.unique(state_columns[state_columns >= 0] // 64):
+                in_word = (state_columns >= 0) & (state_columns // 64 == word)
+                shift = (63 - state_columns[in_word] % 64).astype(np.uint64)
+                bits = np.zeros(state_columns.shape, dtype=np.uint64)
+                bits[in_word] = np.uint64(1) << shift
+                packed[:, word] |= bits[np.arange(len(reencode)), states].sum(
+                    axis=1, dtype=np.uint64)
+
+        # Genotype states, ranks and the row index don't depend on the
+        # wildtype of sites that mutate, so they are kept.
+        self._cache["packed_binary"] = packed
+        if not self._packed:
+            matrix = utils.unpack_binary(packed, self.n_bits)
+            self._set_column("binary", utils.matrix_to_binary(matrix))
+        self.add_n_mutations()
 
     @property
     def mutant(self):
@@ -352,32 +1385,202 @@ class GenotypePhenotypeMap(object):
     @property
     def genotypes(self):
         """Get the genotypes of the system."""
-        return self.data.genotypes.values
+        if self._data is None:
+            return self._genotypes
+
+        # Read from data, stored as set by `genotype_dtype`.
+        try:
+            return self._cache["genotypes"]
+        except KeyError:
+            genotypes = self._store_genotypes(self._data["genotypes"])
+            self._cache["genotypes"] = genotypes
+            return genotypes
+
+    @property
+    def encoding_table(self):
+        """Pandas DataFrame showing how mutations map to binary
+        representation. Built from the shared, read-only table when first
+        accessed; changes to it are used by this map only.
+        """
+        if isinstance(self._encoding, np.ndarray):
+            self._encoding = utils.encoding_array_to_table(self._encoding)
+        return self._encoding
+
+    @encoding_table.setter
+    def encoding_table(self, encoding_table):
+        """Set the encoding table, as a DataFrame or structured array (see
+        `utils.get_encoding_array`).
+        """
+        self._encoding = encoding_table
+
+    @property
+    def n_bits(self):
+        """Number of bits in the binary representation of each genotype."""
+        return int(np.max(self._encoding["binary_index_stop"]))
 
     @property
     def binary(self):
         """Binary representation of genotypes."""
-        return self.data.binary.values
+        if self._packed:
+            matrix = utils.unpack_binary(self.packed_binary, self.n_bits)
+            return utils.matrix_to_binary(matrix)
+        return self._get_column("binary")
+
+    @property
+    def packed_binary(self):
+        """Binary representation of genotypes packed into 64-bit words. See
+        `utils.pack_binary` for the layout.
+        """
+        try:
+            return self._cache["packed_binary"]
+        except KeyError:
+            if self._packed or not self._has_column("binary"):
+                matrix = utils.genotypes_to_binary_matrix(self.genotypes,
+                                                          self._encoding)
+            else:
+                matrix = utils.binary_to_matrix(self.binary)
+            packed = utils.pack_binary(matrix)
+            self._cache["packed_binary"] = packed
+            return packed
+
+    @property
+    def state_matrix(self):
+        """Genotypes as a 2D array of integer states, keyed by the alphabets
+        in `mutations` (see `utils.genotypes_to_states`).
+        """
+        try:
+            return self._cache["state_matrix"]
+        except KeyError:
+            states = utils.genotypes_to_states(self.genotypes,
+                                               self.mutations,
+                                               wildtype=self.wildtype)
+            self._cache["state_matrix"] = states
+            return states
+
+    @property
+    def space(self):
+        """The complete genotype space defined by `mutations` (see
+        `GenotypeSpace`).
+        """
+        try:
+            return self._cache["space"]
+        except KeyError:
+            space = GenotypeSpace(self.mutations, wildtype=self.wildtype)
+            self._cache["space"] = space
+            return space
+
+    @property
+    def ranks(self):
+        """Rank of each genotype in the complete genotype space."""
+        try:
+            return self._cache["ranks"]
+        except KeyError:
+            ranks = self.space.states_to_ranks(self.state_matrix)
+            self._cache["ranks"] = ranks
+            return ranks
+
+    def _get_row_keys(self, states):
+        """Integer keys for rows of a state matrix: their rank if the genotype
+        space fits in 64-bit integers, otherwise a 64-bit hash of the states.
+        """
+        if self.space.size <= np.iinfo(np.int64).max:
+            return self.space.states_to_ranks(states)
+
+        return utils.hash_states(states)
+
+    def _get_row_index(self):
+        """Hash index from genotype keys (see `_get_row_keys`) to row number.
+        If a genotype appears more than once, its first row is used.
+        """
+        try:
+            return self._cache["row_index"]
+        except KeyError:
+            keys = pd.Index(self._get_row_keys(self.state_matrix))
+            rows = np.arange(len(keys))
+            if not keys.is_unique:
+                first = ~keys.duplicated()
+                keys, rows = keys[first], rows[first]
+            self._cache["row_index"] = (keys, rows)
+            return keys, rows
+
+    def locate(self, genotypes):
+        """Find the row of each genotype in the map.
+
+        Lookups go through a hash index over genotype ranks, which is built
+        once and reused until `data` changes.
+
+        Parameters
+        ----------
+        genotypes : str or list of str
+            genotypes to find.
+
+        Returns
+        -------
+        rows : int or numpy.ndarray
+            row number of each genotype, or -1 if it isn't in the map.
+        """
+        if isinstance(genotypes, str):
+            return int(self.locate([genotypes])[0])
+
+        if len(genotypes) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # Encode without raising on letters outside the mutations alphabet.
+        lut = utils.get_state_lut(self.mutations, wildtype=self.wildtype)
+        arr = utils.genotypes_to_array(genotypes)
+        if arr.shape[1] != self.length:
+            return np.full(len(arr), -1, dtype=np.int64)
+        states = lut[np.arange(self.length), arr]
+        unknown = np.any(states < 0, axis=1)
+        states[unknown] = 0
+
+        keys, rows = self._get_row_index()
+        found = keys.get_indexer(self._get_row_keys(states))
+        result = np.where(found < 0, -1, rows[found])
+        result[unknown] = -1
+
+        # Guard against hash collisions.
+        hit = result >= 0
+        match = np.all(self.state_matrix[result[hit]] == states[hit], axis=1)
+        result[np.flatnonzero(hit)[~match]] = -1
+        return result
 
     @property
     def phenotypes(self):
         """Get the phenotypes of the system. """
-        return self.data.phenotypes.values
+        return self._get_column("phenotypes")
+
+    @phenotypes.setter
+    def phenotypes(self, phenotypes):
+        """Set the phenotypes of the system."""
+        self._set_column("phenotypes", phenotypes)
 
     @property
     def stdeviations(self):
         """Get stdeviations"""
-        return self.data.stdeviations.values
+        return self._get_column("stdeviations")
+
+    @stdeviations.setter
+    def stdeviations(self, stdeviations):
+        """Set stdeviations"""
+        self._set_column("stdeviations", stdeviations)
 
     @property
     def n_replicates(self):
         """Return the number of replicate measurements made of the phenotype"""
-        return self.data.n_replicates.values
+        return self._get_column("n_replicates")
+
+    @property
+    def n_mutations(self):
+        """Number of mutations in each genotype."""
+        return self._get_column("n_mutations")
 
     @property
     def index(self):
         """Return numpy array of genotypes position. """
-        return self.data.index.values
+        if self._data is None:
+            return np.arange(self.n)
+        return self._data.index.values
 
     def _add_error(self):
         """Store error maps"""
@@ -389,33 +1592,425 @@ class GenotypePhenotypeMap(object):
 
         Add as a column to the main DataFrame.
         """
-        binary = utils.genotypes_to_binary(self.genotypes, self.encoding_table)
+        matrix = utils.genotypes_to_binary_matrix(self.genotypes,
+                                                  self._encoding)
+
+        # Keep the packed words for vectorized operations.
+        self._cache["packed_binary"] = utils.pack_binary(matrix)
+        if self._packed:
+            return
 
         # Add this as a column to the map.
-        self.data['binary'] = binary
+        self._set_column("binary", utils.matrix_to_binary(matrix))
 
     def add_n_mutations(self):
         """Build a column with the number of mutations in each genotype.
 
         Add as a column to the main DataFrame.
         """
-        n_mutations = [binary.count('1') for binary in self.binary]
-        self.data['n_mutations'] = n_mutations
+        n_mutations = utils.popcount(self.packed_binary).sum(axis=1)
+        self._set_column("n_mutations", n_mutations)
+
+    def _get_site_labels(self):
+        """Site labels from the encoding table, in site order."""
+        return [str(label) for label in _per_site(self._encoding,
+                                                   "site_label")]
+
+    def _pop_columns(self):
+        """Take the map's columns (except genotypes) out of `data` as numpy
+        arrays, so rows can be added or removed. `data` is rebuilt when it is
+        next accessed, with a fresh index.
+        """
+        if self._data is not None:
+            cache = self._cache
+            self._genotypes = self.genotypes
+            self._columns = dict((name, self._data[name].to_numpy())
+                                 for name in self._data.columns
+                                 if name != "genotypes")
+            self._data = None
+            self._cache = cache
+        return self._fill_columns()
+
+    def _add_letters(self, arr):
+        """Add letters in a character matrix (see `utils.genotypes_to_array`)
+        that are not in `mutations` to the end of their site's alphabet. The
+        encoding table and binary representation are rebuilt to match.
+
+        Returns True if any letters were added.
+        """
+        lut = utils.get_state_lut(self.mutations, wildtype=self.wildtype)
+        unknown = lut[np.arange(self.length), arr] < 0
+        if not unknown.any():
+            return False
+
+        # Binary representation under the old encoding.
+        old_packed = self.packed_binary
+        old_table = self._encoding
+
+        mutations = dict(self._mutations)
+        for site in np.flatnonzero(unknown.any(axis=0)):
+            alphabet = mutations[site]
+            if alphabet is None:
+                alphabet = [self.wildtype[site]]
+            letters = np.unique(arr[unknown[:, site], site])
+            mutations[site] = list(alphabet) + [chr(c) for c in letters]
+        self._mutations = mutations
+
+        self.encoding_table = utils.get_encoding_array(
+            self.wildtype,
+            self.mutations,
+            self._get_site_labels()
+        )
 
+        # New letters come after the old ones at each site, so old bits keep
+        # their position within the site's block.
+        def site_bits(table):
+            start = _per_site(table, "binary_index_start").astype(np.int64)
+            stop = _per_site(table, "binary_index_stop").astype(np.int64)
+            return start, stop
+
+        old_start, old_stop = site_bits(old_table)
+        new_start, _ = site_bits(self._encoding)
+        columns = np.concatenate([
+            np.arange(old_start[site], old_stop[site]) - old_start[site]
+            + new_start[site] for site in range(self.length)]).astype(np.int64)
+
+        old_matrix = utils.unpack_binary(old_packed, int(old_stop.max()))
+        matrix = np.zeros((self.n, self.n_bits), dtype=np.uint8)
+        matrix[:, columns] = old_matrix
+
+        # The state matrix is unchanged; everything keyed by the genotype
+        # space is not.
+        states = self._cache.get("state_matrix")
+        self._clear_cache()
+        if states is not None:
+            self._cache["state_matrix"] = states
+        self._cache["packed_binary"] = utils.pack_binary(matrix)
+        if not self._packed:
+            self._pop_columns()["binary"] = utils.matrix_to_binary(matrix)
+        return True
+
+    def add_genotypes(self, genotypes, phenotypes=None, stdeviations=None,
+                      n_replicates=1):
+        """Add genotypes to the end of the map, in place.
+
+        Only the new genotypes are encoded. If they have letters that aren't in
+        `mutations`, the letters are added to the end of their site's alphabet
+        and the encoding table and binary representation are extended.
 
-    def get_missing_genotypes(self):
-        """Get all genotypes missing from the complete genotype-phenotype map."""
-        return utils.get_missing_genotypes(
-            self.genotypes,
-            mutations=self.mutations
-        )
+        Parameters
+        ----------
+        genotypes : array-like
+            genotypes to add.
+
+        phenotypes : array-like (optional)
+            their phenotypes; NaN if not given.
+
+        stdeviations : array-like (optional)
+            their standard deviations.
+
+        n_replicates : int or array-like
+            number of replicate measurements of each phenotype.
+        """
+        genotypes = self._store_genotypes(genotypes)
+        k = len(genotypes)
+        if k == 0:
+            return
+
+        arr = utils.genotypes_to_array(genotypes)
+        if arr.shape[1] != self.length:
+            raise ValueError("Genotypes must be the same length as the "
+                             "wildtype.")
+        added = self._add_letters(arr)
+
+        # Columns for the new rows. Missing values are NaN, except for
+        # stdeviations in a map that has none.
+        new = {}
+        for name, values in [("phenotypes", phenotypes),
+                             ("stdeviations", stdeviations),
+                             ("n_replicates", n_replicates)]:
+            if values is None:
+                values = np.nan
+                if name == "stdeviations":
+                    existing = self._get_column(name)
+                    if existing.dtype == object and \
+                            pd.isna(existing).all():
+                        values = None
+            values = np.asarray(values)
+            if values.ndim == 0:
+                values = np.full(k, values)
+            elif len(values) != k:
+                raise ValueError("{} must be the same length as "
+                                 "genotypes.".format(name))
+            new[name] = values
+
+        matrix = utils.genotypes_to_binary_matrix(genotypes,
+                                                  self._encoding)
+        packed = utils.pack_binary(matrix)
+        new["n_mutations"] = utils.popcount(packed).sum(axis=1)
+        if not self._packed:
+            new["binary"] = utils.matrix_to_binary(matrix)
+
+        # Extend the columns. Other columns are filled with missing values.
+        columns = self._pop_columns()
+        for name, values in columns.items():
+            if name in new:
+                extra = new[name]
+            elif values.dtype.kind in "fc":
+                extra = np.full(k, np.nan)
+            else:
+                extra = np.full(k, None, dtype=object)
+            columns[name] = np.concatenate([values, extra])
+
+        old_packed = self.packed_binary
+        cache = self._cache
+        n = self.n
+        if self._genotype_dtype not in (None, "bytes"):
+            genotypes = pd.concat([pd.Series(self._genotypes),
+                                   pd.Series(genotypes)], ignore_index=True)
+            self._genotypes = genotypes.astype(self._genotype_dtype).values
+        else:
+            self._genotypes = np.concatenate([self._genotypes, genotypes])
+
+        # Extend the derived arrays that are cached; drop the rest.
+        self._cache = {"packed_binary": np.concatenate([old_packed, packed])}
+        if "space" in cache:
+            self._cache["space"] = cache["space"]
+        if "state_matrix" in cache:
+            states = utils.genotypes_to_states(genotypes, self.mutations,
+                                               wildtype=self.wildtype)
+            self._cache["state_matrix"] = np.concatenate(
+                [cache["state_matrix"], states])
+            if "ranks" in cache:
+                ranks = self.space.states_to_ranks(states)
+                self._cache["ranks"] = np.concatenate([cache["ranks"], ranks])
+            if "row_index" in cache and not added:
+                keys, rows = cache["row_index"]
+                new_keys = pd.Index(self._get_row_keys(states))
+                new_rows = np.arange(n, n + k)
+                first = ~new_keys.duplicated() & ~new_keys.isin(keys)
+                self._cache["row_index"] = (keys.append(new_keys[first]),
+                                            np.concatenate([rows,
+                                                            new_rows[first]]))
+
+    def remove_genotypes(self, genotypes):
+        """Remove genotypes from the map, in place. Every row with one of the
+        genotypes is removed.
+
+        Parameters
+        ----------
+        genotypes : str or array-like
+            genotypes to remove. Raises a ValueError if any are not in the map.
+        """
+        if isinstance(genotypes, str):
+            genotypes = [genotypes]
+        found = self.locate(genotypes)
+        if np.any(found < 0):
+            missing = np.asarray(genotypes)[found < 0]
+            raise ValueError("Genotypes not in the map: {}".format(
+                ", ".join(str(g) for g in missing[:5])))
+
+        # All rows with the same key as a genotype to remove.
+        keys = pd.Index(self._get_row_keys(self.state_matrix))
+        targets = np.unique(found)
+        match = pd.Index(keys[targets]).get_indexer(keys)
+        drop = match >= 0
+
+        # Guard against hash collisions.
+        states = self.state_matrix
+        same = np.all(states[drop] == states[targets[match[drop]]], axis=1)
+        drop[np.flatnonzero(drop)[~same]] = False
+
+        self._take_rows(np.flatnonzero(~drop))
+
+    def _take_rows(self, rows):
+        """Keep only the given rows of the map, in place. Cached arrays are
+        sliced rather than rebuilt.
+        """
+        columns = self._pop_columns()
+        for name, values in columns.items():
+            columns[name] = values[rows]
+        self._genotypes = self._genotypes[rows]
+
+        cache = self._cache
+        self._cache = {}
+        for name in ["packed_binary", "state_matrix", "ranks"]:
+            if name in cache:
+                self._cache[name] = cache[name][rows]
+        if "space" in cache:
+            self._cache["space"] = cache["space"]
+
+    def subset(self, index):
+        """Get a genotype-phenotype map with a subset of this map's rows.
+
+        The new map shares this map's mutations and encoding table, and its
+        derived arrays (e.g. `packed_binary`) are sliced from this map's
+        instead of being rebuilt, as are attributes of subclasses listed in
+        `_row_attributes`. If `index` is a slice, the genotypes and
+        derived arrays are read-only views of this map's, and the columns
+        (e.g. `phenotypes`) are copied. Either way, changing the new map,
+        including its `data`, doesn't change this map.
+
+        Parameters
+        ----------
+        index : slice, array of int, or array of bool
+            rows to keep.
+
+        Returns
+        -------
+        gpm : GenotypePhenotypeMap
+            the new map. It is the same class as this map.
+        """
+        if not isinstance(index, slice):
+            index = np.asarray(index)
+            if index.dtype == bool and len(index) != self.n:
+                raise ValueError("A boolean index must be the same length "
+                                 "as the map.")
+
+        # Keep attributes of subclasses, e.g. simulation parameters.
+        gpm = self.__class__.__new__(self.__class__)
+        gpm.__dict__.update(self.__dict__)
+        gpm.metadata = dict(self.metadata)
+        gpm._columns = dict(self._columns)
+        gpm._cache = dict(self._cache)
+        if isinstance(self._encoding, pd.DataFrame):
+            gpm._encoding = self._encoding.copy()
+        gpm._take_rows(index)
+        for name in self._row_attributes:
+            values = gpm.__dict__.get(name)
+            if values is not None:
+                gpm.__dict__[name] = np.asarray(values)[..., index]
+
+        if isinstance(index, slice):
+            for name, values in gpm._columns.items():
+                if values is not None:
+                    gpm._columns[name] = values.copy()
+            for values in [gpm._genotypes] + list(gpm._cache.values()):
+                if isinstance(values, np.ndarray):
+                    values.flags.writeable = False
+
+        gpm._add_error()
+        return gpm
+
+    def hamming_to(self, reference=None):
+        """Get the number of sites at which each genotype differs from a
+        reference genotype.
+
+        Parameters
+        ----------
+        reference : str (optional)
+            reference genotype. If not given, the wildtype is used.
+
+        Returns
+        -------
+        distances : numpy.ndarray
+            Hamming distance from each genotype to the reference.
+        """
+        if reference is None:
+            reference = self.wildtype
+
+        # Letters outside a site's alphabet get state -1, i.e. never match.
+        lut = utils.get_state_lut(self.mutations, wildtype=self.wildtype)
+        ref = utils.genotypes_to_array([reference])[0]
+        if len(ref) != self.length:
+            raise ValueError("reference must be the same length as the "
+                             "genotypes.")
+        ref_states = lut[np.arange(len(ref)), ref]
+        return (self.state_matrix != ref_states).sum(axis=1)
+
+    def get_neighbor_graph(self):
+        """Get the graph of genotypes in the map that differ by a single
+        mutation.
+
+        Neighbors are generated for each genotype by changing one site's
+        state at a time and are looked up in the map's row index, so this
+        runs in O(n * length * alphabet size) and works for incomplete maps.
+
+        Returns
+        -------
+        graph : scipy.sparse.csr_matrix, dtype int8, shape (n, n)
+            adjacency matrix; graph[i, j] is 1 if genotypes i and j are
+            neighbors.
+        """
+        states = self.state_matrix.astype(np.int64)
+        keys, rows = self._get_row_index()
+        use_ranks = self.space.size <= np.iinfo(np.int64).max
+        if use_ranks:
+            ranks = self.ranks
+            places = self.space.places
+
+        sources, targets = [], []
+        for site, radix in enumerate(self.space.radices):
+            for shift in range(1, radix):
+                new_states = (states[:, site] + shift) % radix
+                if use_ranks:
+                    neighbor_keys = ranks + (new_states - states[:, site]) * places[site]
+                else:
+                    neighbors = states.copy()
+                    neighbors[:, site] = new_states
+                    neighbor_keys = self._get_row_keys(neighbors)
+
+                found = keys.get_indexer(neighbor_keys)
+                hit = np.flatnonzero(found >= 0)
+                target = rows[found[hit]]
+
+                # Guard against hash collisions.
+                if not use_ranks:
+                    match = np.all(states[target] == neighbors[hit], axis=1)
+                    hit, target = hit[match], target[match]
+
+                sources.append(hit)
+                targets.append(target)
+
+        sources = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+        targets = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+        data = np.ones(len(sources), dtype=np.int8)
+        return scipy.sparse.csr_matrix((data, (sources, targets)),
+                                       shape=(self.n, self.n))
+
+    def get_design_matrix(self, sparse=True):
+        """Get the binary representation of the genotypes as a one-hot design
+        matrix, with one column per mutation in the encoding table.
+
+        Parameters
+        ----------
+        sparse : bool (default=True)
+            If True, return a scipy.sparse CSR matrix. Otherwise, return a
+            dense numpy array.
+        """
+        return utils.genotypes_to_design_matrix(self.genotypes,
+                                                self._encoding,
+                                                sparse=sparse)
+
+    def get_missing_genotypes(self, lazy=False):
+        """Get all genotypes missing from the complete genotype-phenotype map.
+
+        Parameters
+        ----------
+        lazy : bool (default=False)
+            If True, return a generator that decodes missing genotypes in
+            chunks instead of a list.
+        """
+        space = GenotypeSpace(self.mutations, wildtype=self.wildtype)
+        if lazy:
+            return space.iter_missing(self.genotypes)
+        return space.unrank(space.missing_ranks(self.genotypes)).tolist()
 
     def get_all_possible_genotypes(self):
         """Get the complete set of genotypes possible. There is no particular order
         to the genotypes. Consider sorting.
         """
         # Get all genotypes.
-        return utils.mutations_to_genotypes(self.mutations, wildtype=self.wildtype)
+        space = GenotypeSpace(self.mutations, wildtype=self.wildtype)
+        return space[:].tolist()
+
+    def iter_all_possible_genotypes(self, chunksize=2**16, output="genotypes"):
+        """Iterate over the complete set of genotypes possible in chunks of at
+        most `chunksize` genotypes. See `GenotypeSpace.iter_chunks` for the
+        available outputs.
+        """
+        space = GenotypeSpace(self.mutations, wildtype=self.wildtype)
+        return space.iter_chunks(chunksize=chunksize, output=output)
 
     def get_missing_binary(self):
         """Get all binary representations of genotypes missing from the complete
@@ -423,10 +2018,7 @@ class GenotypePhenotypeMap(object):
         """
 
         geno = self.get_missing_genotypes()
-        binary = utils.genotypes_to_binary(self.wildtype,
-            geno,
-            self.mutations
-        )
+        binary = utils.genotypes_to_binary(geno, self._encoding)
 
         return binary
 
@@ -437,9 +2029,6 @@ class GenotypePhenotypeMap(object):
 
         # Get all genotypes.
         geno = self.get_all_possible_genotypes()
-        binary = utils.genotypes_to_binary(self.wildtype,
-            geno,
-            self.mutations
-        )
+        binary = utils.genotypes_to_binary(geno, self._encoding)
 
         return binary
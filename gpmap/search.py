@@ -0,0 +1,219 @@
+#
+# Author: Zach Sailer
+#
+# ----------------------------------------------------------
+# Outside imports
+# ----------------------------------------------------------
+
+import numpy as np
+
+# ----------------------------------------------------------
+# Local imports
+# ----------------------------------------------------------
+
+import gpmap.utils as utils
+from gpmap.distance import hamming_to_many
+
+
+class HammingIndex(object):
+    """Index for finding the genotypes in a genotype-phenotype map that are
+    closest to a query genotype in Hamming distance.
+
+    Candidates for a radius query come from whichever of two filters
+    yields fewer genotypes; only candidates are compared to the query.
+
+    1. Multi-index hashing: sites are split into `n_blocks` contiguous
+       blocks and genotypes are hashed by their states in each block. If a
+       genotype is within distance r of a query, then among any r + 1 blocks
+       at least one matches the query exactly, so only the r + 1 smallest
+       matching buckets are checked. This works well for genotypes spread
+       across the space.
+
+    2. Mutated sites: a genotype within distance r of a query either
+       mutates (relative to the wildtype) one of the sites the query
+       mutates, or carries at most r - (query's mutations) mutations. This
+       works well for maps of a few mutations around a wildtype, e.g. deep
+       mutational scans, where blocks are dominated by the wildtype.
+
+    If neither filter helps, the query falls back to a (vectorized) linear
+    scan.
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        map to index.
+
+    n_blocks : int (optional)
+        number of blocks to split sites into. Defaults to min(length, 8).
+        More blocks allow larger radii to use the index.
+    """
+    def __init__(self, gpm, n_blocks=None):
+        self._gpm = gpm
+        self._states = gpm.state_matrix
+        self._lut = utils.get_state_lut(gpm.mutations, wildtype=gpm.wildtype)
+
+        length = self._states.shape[1]
+        if n_blocks is None:
+            n_blocks = min(length, 8)
+        if not 1 <= n_blocks <= max(length, 1):
+            raise ValueError("n_blocks must be between 1 and the length of "
+                             "the genotypes.")
+        self.blocks = np.array_split(np.arange(length), n_blocks)
+
+        # Sorted hash table for each block.
+        self._tables = []
+        for sites in self.blocks:
+            keys = utils.hash_states(self._states[:, sites])
+            order = np.argsort(keys, kind="stable")
+            self._tables.append((keys[order], order))
+
+        # Rows that are mutated at each site, as CSR-style arrays.
+        wildtype = self._encode(gpm.wildtype)[0]
+        self._wildtype = wildtype
+        mutated = self._states != wildtype
+        sites, rows = np.nonzero(mutated.T)
+        self._site_rows = rows
+        self._site_ptr = np.zeros(length + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sites, minlength=length), out=self._site_ptr[1:])
+
+        # Rows sorted by their number of mutations.
+        n_mutations = mutated.sum(axis=1)
+        self._by_n_mutations = np.argsort(n_mutations, kind="stable")
+        self._n_mutations_ptr = np.cumsum(
+            np.bincount(n_mutations, minlength=length + 1))
+
+    @property
+    def n_blocks(self):
+        """Number of blocks of sites."""
+        return len(self.blocks)
+
+    def _encode(self, genotypes):
+        """Convert query genotypes to states; unknown letters get state -1,
+        which never matches.
+        """
+        if isinstance(genotypes, str):
+            genotypes = [genotypes]
+        arr = utils.genotypes_to_array(genotypes)
+        if arr.shape[1] != self._states.shape[1]:
+            raise ValueError("Query genotypes must be the same length as the "
+                             "genotypes in the map.")
+        return self._lut[np.arange(arr.shape[1]), arr]
+
+    def _block_candidates(self, query, radius):
+        """Rows that match the query exactly in at least one of the
+        radius + 1 blocks with the smallest buckets, and the total size of
+        those buckets. Returns (None, n) if there are too few blocks.
+        """
+        if radius >= self.n_blocks:
+            return None, len(self._states)
+
+        buckets = []
+        for sites, (keys, order) in zip(self.blocks, self._tables):
+            key = utils.hash_states(query[None, sites])[0]
+            lo = np.searchsorted(keys, key, side="left")
+            hi = np.searchsorted(keys, key, side="right")
+            buckets.append((hi - lo, order, lo, hi))
+
+        buckets.sort(key=lambda b: b[0])
+        buckets = buckets[:radius + 1]
+        size = sum(b[0] for b in buckets)
+        return [order[lo:hi] for _, order, lo, hi in buckets], size
+
+    def _site_candidates(self, query, radius):
+        """Rows mutated at a site the query mutates, plus rows with few
+        enough mutations to be within the radius anyway, and the total size
+        of those lists.
+        """
+        sites = np.flatnonzero(query != self._wildtype)
+        max_mutations = radius - len(sites)
+        rows = []
+        if max_mutations >= 0:
+            stop = self._n_mutations_ptr[min(max_mutations,
+                                             len(self._n_mutations_ptr) - 1)]
+            rows.append(self._by_n_mutations[:stop])
+        for site in sites:
+            rows.append(self._site_rows[self._site_ptr[site]:
+                                        self._site_ptr[site + 1]])
+        return rows, sum(len(r) for r in rows)
+
+    def _radius(self, query, radius):
+        """Rows and distances within a radius of one encoded query."""
+        n = len(self._states)
+        block_rows, block_size = self._block_candidates(query, radius)
+        site_rows, site_size = self._site_candidates(query, radius)
+
+        # Use the smaller candidate set, unless a scan is just as cheap.
+        if min(block_size, site_size) >= n // 2:
+            rows = np.arange(n)
+        else:
+            rows = block_rows if block_size <= site_size else site_rows
+            rows = np.unique(np.concatenate(rows))
+
+        distances = hamming_to_many(query, self._states[rows])
+        keep = distances <= radius
+        rows, distances = rows[keep], distances[keep]
+        order = np.lexsort((rows, distances))
+        return rows[order], distances[order]
+
+    def radius(self, genotypes, radius):
+        """Find all genotypes in the map within a Hamming distance of each
+        query genotype.
+
+        Parameters
+        ----------
+        genotypes : str or list of str
+            query genotypes.
+        radius : int
+            maximum Hamming distance.
+
+        Returns
+        -------
+        rows : list of numpy.ndarray
+            rows in the map within the radius of each query, sorted by
+            distance.
+        distances : list of numpy.ndarray
+            distance to each of those rows.
+        """
+        rows, distances = [], []
+        for query in self._encode(genotypes):
+            r, d = self._radius(query, radius)
+            rows.append(r)
+            distances.append(d)
+        return rows, distances
+
+    def knn(self, genotypes, k=1):
+        """Find the k genotypes in the map closest to each query genotype.
+        Ties are broken by row number.
+
+        Parameters
+        ----------
+        genotypes : str or list of str
+            query genotypes.
+        k : int
+            number of neighbors.
+
+        Returns
+        -------
+        rows : numpy.ndarray, shape (n_queries, k)
+            rows of the nearest genotypes, sorted by distance.
+        distances : numpy.ndarray, shape (n_queries, k)
+            distance to each of those rows.
+        """
+        if not 1 <= k <= len(self._states):
+            raise ValueError("k must be between 1 and the number of "
+                             "genotypes in the map.")
+
+        queries = self._encode(genotypes)
+        rows = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.int64)
+        for i, query in enumerate(queries):
+            # Grow the radius until k genotypes are found. Everything outside
+            # the radius is farther away, so these are the nearest.
+            radius = 0
+            while True:
+                r, d = self._radius(query, radius)
+                if len(r) >= k:
+                    break
+                radius += 1
+            rows[i], distances[i] = r[:k], d[:k]
+        return rows, distances
@@ -2,6 +2,7 @@ import random
 import numpy as np
 from gpmap import utils
 from gpmap.gpm import GenotypePhenotypeMap
+from gpmap.space import GenotypeSpace
 
 
 def random_mutation_set(length, alphabet_size=2, type='AA'):
@@ -41,7 +42,8 @@ class BaseSimulation(GenotypePhenotypeMap):
 
     def __init__(self, wildtype, mutations, *args, **kwargs):
         # build genotypes
-        genotypes = utils.mutations_to_genotypes(mutations, wildtype=wildtype)
+        space = GenotypeSpace(mutations, wildtype=wildtype)
+        genotypes = space[:]
         phenotypes = np.empty(len(genotypes), dtype=float)
         super(BaseSimulation, self).__init__(wildtype,
                                              genotypes,
@@ -82,7 +84,7 @@ class BaseSimulation(GenotypePhenotypeMap):
             same length as phenotypes and will be assigned to each phenotype.
         """
         stdeviations = np.ones(len(self.phenotypes)) * sigma
-        self.data.stdeviations = stdeviations
+        self.stdeviations = stdeviations
         return self
 
     def build(self):
@@ -1,6 +1,6 @@
 import numpy as np
 from gpmap.gpm import GenotypePhenotypeMap
-from gpmap import utils
+from gpmap import utils, distance
 from .base import random_mutation_set, BaseSimulation
 
 
@@ -47,6 +47,7 @@ class MountFujiSimulation(BaseSimulation):
         landscapes." Journal of Statistical Mechanics: Theory and Experiment
         2013.01 (2013): P01005.
     """
+    _row_attributes = ("_hamming", "_roughness")
 
     def __init__(
             self,
@@ -124,9 +125,10 @@ class MountFujiSimulation(BaseSimulation):
             return self._hamming
         # calculate the hamming distance if not done already
         except AttributeError:
-            hd = np.empty(self.n, dtype=int)
-            for i, g in enumerate(self.genotypes):
-                hd[i] = utils.hamming_distance(self.wildtype, g)
+            wildtype = utils.genotypes_to_states([self.wildtype],
+                                                 self.mutations,
+                                                 wildtype=self.wildtype)
+            hd = distance.hamming_to_many(wildtype[0], self.state_matrix)
             self._hamming = hd
             return self._hamming
 
@@ -209,4 +211,4 @@ class MountFujiSimulation(BaseSimulation):
 
     def build(self):
         """Construct phenotypes using a rough Mount Fuji model."""
-        self.data.phenotypes = self.roughness + self.scale
+        self.phenotypes = self.roughness + self.scale
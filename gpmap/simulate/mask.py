@@ -1,12 +1,10 @@
 import numpy as np
-import pandas as pd
-from .. import GenotypePhenotypeMap
 
 
 def mask(gpm, mask_fraction):
     """Create a new GenotypePhenotypeMap object from a random subset of another
-    GenotypePhenotypeMap.
-
+    GenotypePhenotypeMap (see `GenotypePhenotypeMap.subset`). Changing the new
+    map (e.g. its phenotypes or data) doesn't change `gpm`.
 
     Returns
     -------
@@ -26,21 +24,7 @@ def mask(gpm, mask_fraction):
     true_mask_fraction = 1 - float(number_to_choose) / gpm.n
 
     # Randomly choose genotypes
-    index = np.random.choice(gpm.index, number_to_choose, replace=False)
-
-    # Check n_replicates datatype
-    if type(gpm.n_replicates) == int:
-        n_replicates = gpm.n_replicates
-    elif type(gpm.n_replicates) == pd.Series or type(gpm.n_replicates) == np.ndarray:
-        n_replicates = gpm.n_replicates[index].reset_index(drop=True)
-    else:
-        raise Exception("n_replicates are not a valid dtype.")
+    index = np.random.choice(gpm.n, number_to_choose, replace=False)
 
     # return Subset genotype
-    return true_mask_fraction, GenotypePhenotypeMap(
-        gpm.wildtype,
-        gpm.genotypes[index].reset_index(drop=True),
-        gpm.phenotypes[index].reset_index(drop=True),
-        mutations=gpm.mutations,
-        stdeviations=gpm.stdeviations[index].reset_index(drop=True),
-        n_replicates=n_replicates)
+    return true_mask_fraction, gpm.subset(index)
@@ -1,7 +1,7 @@
 import numpy as np
 import random
 from gpmap.gpm import GenotypePhenotypeMap
-from gpmap import utils
+from gpmap import utils, distance
 from .base import random_mutation_set, BaseSimulation
 
 
@@ -79,6 +79,7 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
         landscapes." Journal of Statistical Mechanics: Theory and Experiment
         2013.01 (2013): P01005.
     """
+    _row_attributes = ("_hamming", "_roughness", "_scale")
 
     def __init__(
             self,
@@ -207,10 +208,9 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
             return self._hamming
         # calculate the hamming distance if not done already
         except AttributeError:
-            hd = np.empty([len(self.peaks), len(self.genotypes)], dtype=int)
-            for i, peak in enumerate(self.peaks):
-                for j, g in enumerate(self.genotypes):
-                    hd[i][j] = utils.hamming_distance(peak, g)
+            peaks = utils.genotypes_to_states(self.peaks, self.mutations,
+                                              wildtype=self.wildtype)
+            hd = distance.hamming_cdist(peaks, self.state_matrix)
             self._hamming = hd
             return self._hamming
 
@@ -321,4 +321,4 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
 
     def build(self):
         """Construct phenotypes using a rough Mount Fuji model."""
-        self.data.phenotypes = self.roughness + self.scale
+        self.phenotypes = self.roughness + self.scale
@@ -70,7 +70,7 @@ class NKSimulation(BaseSimulation):
         self._keys = np.array(["".join(r) for r in
                                it.product('01', repeat=self.K)])
         # Reset phenotypes
-        self.data['phenotypes'] = np.empty(self.n, dtype=float)
+        self.phenotypes = np.empty(self.n, dtype=float)
 
     def set_random_values(self, k_range=(0, 1)):
         """Set the values of the NK table by drawing from a uniform
@@ -120,4 +120,4 @@ class NKSimulation(BaseSimulation):
                         self.binary[i][j - pre_neighbor:j + neighbor + 1])
                 f_total += nk_table[f]
             phenotypes[i] = f_total
-        self.data.phenotypes = phenotypes
+        self.phenotypes = phenotypes
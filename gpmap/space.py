@@ -0,0 +1,248 @@
+#
+# Author: Zach Sailer
+#
+# ----------------------------------------------------------
+# Outside imports
+# ----------------------------------------------------------
+
+import numbers
+import numpy as np
+
+# ----------------------------------------------------------
+# Local imports
+# ----------------------------------------------------------
+
+import gpmap.utils as utils
+
+
+class GenotypeSpace(object):
+    """The complete set of genotypes described by a mutations dictionary,
+    addressed by integer rank instead of being enumerated.
+
+    Genotypes are ranked as mixed-radix numbers, with the alphabet sizes as
+    radices and the last site varying fastest. This is the same order as
+    `utils.mutations_to_genotypes`, so ``space[i]`` is the i-th genotype in
+    that list.
+
+    Parameters
+    ----------
+    mutations : dict
+        Dictionary that maps each site indice to their possible substitution
+        alphabet.
+
+    wildtype : str (optional)
+        wildtype sequence. Required if any site in mutations is None.
+
+    Attributes
+    ----------
+    radices : numpy.ndarray
+        size of the alphabet at each site.
+
+    size : int
+        number of genotypes in the space.
+    """
+    def __init__(self, mutations, wildtype=None):
+        # Make sure the keys in the mutations dict are integers.
+        self._mutations = dict([(int(key), val)
+                               for key, val in mutations.items()])
+        self._wildtype = wildtype
+
+        # Lookup table from letters to states.
+        self._lut = utils.get_state_lut(self._mutations, wildtype=wildtype)
+
+        radices = []
+        for site in range(len(self._mutations)):
+            alphabet = self._mutations[site]
+            radices.append(1 if alphabet is None else len(alphabet))
+        self.radices = np.array(radices, dtype=np.int64)
+
+        # Use Python integers so that huge spaces don't overflow.
+        self._radices = radices
+        self.size = 1
+        places = []
+        for radix in radices[::-1]:
+            places.append(self.size)
+            self.size *= radix
+        self._places = places[::-1]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return "GenotypeSpace(length={}, size={})".format(self.length,
+                                                          self.size)
+
+    def __contains__(self, genotype):
+        if not isinstance(genotype, str) or len(genotype) != self.length:
+            return False
+        try:
+            self.rank(genotype)
+        except ValueError:
+            return False
+        return True
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.unrank(np.arange(*index.indices(self.size)))
+
+        if isinstance(index, numbers.Integral):
+            index = int(index)
+            if index < 0:
+                index += self.size
+            if not 0 <= index < self.size:
+                raise IndexError("genotype index out of range.")
+            return self.unrank(index)
+
+        return self.unrank(index)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            for genotype in chunk:
+                yield str(genotype)
+
+    @property
+    def length(self):
+        """Number of sites in each genotype."""
+        return len(self.radices)
+
+    @property
+    def mutations(self):
+        """Mutations dictionary that defines the space."""
+        return self._mutations
+
+    @property
+    def wildtype(self):
+        """Wildtype genotype."""
+        return self._wildtype
+
+    @property
+    def places(self):
+        """Place value of each site as an int64 array."""
+        if self.size > np.iinfo(np.int64).max:
+            raise OverflowError("Genotype space is too large to rank with "
+                                "64-bit integers.")
+        return np.array(self._places, dtype=np.int64)
+
+    def states_to_ranks(self, states):
+        """Convert a 2D array of integer states (see
+        `utils.genotypes_to_states`) to ranks.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        return states @ self.places
+
+    def ranks_to_states(self, ranks):
+        """Convert an array of ranks to a 2D array of integer states."""
+        ranks = np.asarray(ranks, dtype=np.int64)
+        if np.any((ranks < 0) | (ranks >= self.size)):
+            raise IndexError("ranks must be between 0 and the size of the "
+                             "genotype space.")
+        return (ranks[:, None] // self.places) % self.radices
+
+    def rank(self, genotypes):
+        """Get the rank of a genotype, or an array of ranks for a list of
+        genotypes.
+        """
+        if isinstance(genotypes, str):
+            states = utils.genotypes_to_states([genotypes], self._mutations,
+                                               wildtype=self._wildtype)[0]
+            return sum(int(s) * p for s, p in zip(states, self._places))
+
+        states = utils.genotypes_to_states(genotypes, self._mutations,
+                                           wildtype=self._wildtype)
+        return self.states_to_ranks(states)
+
+    def unrank(self, ranks):
+        """Get the genotype with a given rank, or an array of genotypes for an
+        array of ranks.
+        """
+        if isinstance(ranks, numbers.Integral):
+            states = [(int(ranks) // p) % r
+                      for p, r in zip(self._places, self._radices)]
+            return utils.states_to_genotypes([states], self._mutations,
+                                             wildtype=self._wildtype)[0]
+
+        states = self.ranks_to_states(ranks)
+        return utils.states_to_genotypes(states, self._mutations,
+                                         wildtype=self._wildtype)
+
+    def iter_chunks(self, chunksize=2**16, output="genotypes", start=0,
+                    stop=None):
+        """Iterate over the genotype space in chunks of at most `chunksize`
+        genotypes, so that the space never has to fit in memory at once.
+
+        Parameters
+        ----------
+        chunksize : int
+            number of genotypes in each chunk.
+
+        output : 'genotypes', 'bytes', 'states', or 'ranks'
+            What to yield for each chunk: an array of genotype strings, a
+            fixed-width bytes array, a 2D array of integer states, or an
+            array of ranks.
+
+        start, stop : int (optional)
+            range of ranks to iterate over. Defaults to the whole space.
+        """
+        if output not in ["genotypes", "bytes", "states", "ranks"]:
+            raise ValueError("output must be 'genotypes', 'bytes', 'states' "
+                             "or 'ranks'.")
+
+        if stop is None:
+            stop = self.size
+
+        for chunk_start in range(start, stop, chunksize):
+            ranks = np.arange(chunk_start, min(chunk_start + chunksize, stop),
+                              dtype=np.int64)
+            if output == "ranks":
+                yield ranks
+                continue
+
+            states = self.ranks_to_states(ranks)
+            if output == "states":
+                yield states.astype(np.uint8)
+            else:
+                yield utils.states_to_genotypes(
+                    states, self._mutations, wildtype=self._wildtype,
+                    as_bytes=(output == "bytes"))
+
+    def observed_bitmap(self, genotypes):
+        """Build a bitmap with one bit per genotype in the space, set if the
+        genotype's rank is found in a list of genotypes.
+
+        Returns
+        -------
+        bitmap : numpy.ndarray, dtype uint8
+            bitmap with ceil(size / 8) bytes; bit i is stored in byte i // 8
+            (most significant bit first, as in `numpy.packbits`).
+        """
+        ranks = self.rank(genotypes)
+        bitmap = np.zeros(-(-self.size // 8), dtype=np.uint8)
+        np.bitwise_or.at(bitmap, ranks >> 3,
+                         np.left_shift(1, 7 - (ranks & 7)).astype(np.uint8))
+        return bitmap
+
+    def iter_missing_ranks(self, genotypes, chunksize=2**20):
+        """Iterate over arrays of ranks (in increasing order) of the genotypes
+        in the space that are not found in a list of genotypes. Each array
+        covers at most `chunksize` ranks of the space.
+        """
+        bitmap = self.observed_bitmap(genotypes)
+        step = max(chunksize // 8, 1)
+        for start in range(0, len(bitmap), step):
+            bits = np.unpackbits(bitmap[start:start + step])
+            ranks = np.flatnonzero(bits == 0) + start * 8
+            yield ranks[ranks < self.size]
+
+    def missing_ranks(self, genotypes):
+        """Get the ranks of genotypes in the space that are not found in a
+        list of genotypes.
+        """
+        return np.concatenate(list(self.iter_missing_ranks(genotypes)))
+
+    def iter_missing(self, genotypes, chunksize=2**20):
+        """Lazily iterate over the genotypes in the space that are not found in
+        a list of genotypes, decoding `chunksize` ranks at a time.
+        """
+        for ranks in self.iter_missing_ranks(genotypes, chunksize=chunksize):
+            for genotype in self.unrank(ranks):
+                yield str(genotype)
@@ -1,22 +1,21 @@
 import numpy as np
 import math
 
+from gpmap import utils
+
 # -----------------------------------------------------------------------
 # Unbiased calculations of sample statistics to error statistics
 # -----------------------------------------------------------------------
 
 def coverage(gpm):
-    # Get binary representation
-    binary = gpm.binary
-
-    # Determine shape of obs matrix
-    shape = (len(binary), len(binary[0]))
-
-    # Initialize obs matrix
-    obs_matrix = np.array([np.array(list(b)) for b in binary], dtype=int)
+    """Return the number of times each mutation (i.e. each bit in the binary
+    representation) is observed in a genotype-phenotype map."""
+    # Initialize obs matrix from the binary representation
+    obs_matrix = utils.unpack_binary(gpm.packed_binary, gpm.n_bits)
 
     # Compute the average times each mutation is observed
     observations = obs_matrix.sum(axis=0)
+    return observations
 
 
 
@@ -19,8 +19,10 @@ encoding : dict
 # Miscellaneous Python functions for random task
 # -------------------------------------------------------
 
+import functools
 import itertools as it
 import numpy as np
+import scipy.sparse
 from scipy.special import comb
 from collections import OrderedDict
 import warnings
@@ -112,13 +114,14 @@ def find_differences(s1, s2):
 
 def farthest_genotype(reference, genotypes):
     """Find the genotype in the system that differs at the most sites. """
-    mutations = 0
-    for genotype in genotypes:
-        differs = hamming_distance(genotype, reference)
-        if differs > mutations:
-            mutations = int(differs)
-            mutant = str(genotype)
-    return mutant
+    from gpmap.distance import hamming_to_many
+
+    differs = hamming_to_many(genotypes_to_array([reference])[0],
+                              genotypes_to_array(genotypes))
+    mutant = genotypes[int(np.argmax(differs))]
+    if isinstance(mutant, bytes):
+        mutant = mutant.decode()
+    return str(mutant)
 
 
 # -------------------------------------------------------
@@ -132,92 +135,333 @@ def list_binary(length):
     return np.array(["".join(seq) for seq in it.product("01", repeat=length)])
 
 
-def get_encoding_table(wildtype, mutations, site_labels=None):
-    """This function constructs a lookup table (pandas.DataFrame) for mutations
-    in a given mutations dictionary. This table encodes mutations with a binary representation.
-    """
+# -------------------------------------------------------
+# Encoding tables
+# -------------------------------------------------------
 
-    # Either grab or create site_labels.  Force them to be strings.
-    if site_labels is None:
-        site_labels = ["{}".format(i) for i in range(len(wildtype))]
-    else:
+# Number of encoding tables kept by `get_encoding_table`.
+ENCODING_CACHE_SIZE = 256
+
+
+def _encoding_key(wildtype, mutations, site_labels=None):
+    """Hashable fingerprint of the arguments to `get_encoding_table`."""
+    if site_labels is not None:
         if len(site_labels) != len(wildtype):
             err = "site_labels must be the same length as the number of sites per genotype\n"
             raise ValueError(err)
-        site_labels = ["{}".format(x) for x in site_labels]
+        site_labels = tuple("{}".format(x) for x in site_labels)
+
+        # Default labels share a table with no labels.
+        if site_labels == tuple("{}".format(i) for i in range(len(wildtype))):
+            site_labels = None
+
+    mutations = tuple(
+        (int(site), None if alphabet is None else tuple(alphabet))
+        for site, alphabet in mutations.items())
+    return str(wildtype), mutations, site_labels
+
+
+@functools.lru_cache(maxsize=ENCODING_CACHE_SIZE)
+def _cached_encoding(key):
+    """Build the encoding array and table for a key from `_encoding_key`.
+    The array is shared by every caller with the same key; the DataFrame is
+    copied by `get_encoding_table`.
+    """
+    wildtype, mutations, site_labels = key
+
+    # Either grab or create site_labels.
+    if site_labels is None:
+        site_labels = ["{}".format(i) for i in range(len(wildtype))]
 
     # Initialize table
-    table = []
+    rows = []
     mutation_index_counter = 0
     binary_index_counter = 0
-    for genotype_index, alphabet in mutations.items():
-        # Ty    pe check genotype_index
-        genotype_index = int(genotype_index)
+    for genotype_index, alphabet in mutations:
+        wt_site = wildtype[genotype_index]
+        label = site_labels[genotype_index]
 
         # Handle sites that don't mutate.
         if alphabet is None:
+            rows.append((genotype_index, wt_site, "", "",
+                         binary_index_counter, binary_index_counter, -1,
+                         label))
+            continue
+
+        # Set wildtype state at a given genotype_index.
+        n = len(alphabet) - 1  # number of mutation neighbors
+        rows.append((genotype_index, wt_site, wt_site, "0" * n,
+                     binary_index_counter, binary_index_counter + n, -1,
+                     label))
+
+        # Add all possible mutations at given site
+        alphabet_ = [letter for letter in alphabet if letter != wt_site]
+        for j in range(n):
+            mutation_index_counter += 1
+            binary_repr = "0" * j + "1" + "0" * (n - j - 1)
+            rows.append((genotype_index, wt_site, alphabet_[j], binary_repr,
+                         binary_index_counter, binary_index_counter + n,
+                         mutation_index_counter, label))
+        binary_index_counter += n
+
+    # Structured array form.
+    width = max([len(row[3]) for row in rows] + [1])
+    label_width = max([len(row[7]) for row in rows] + [1])
+    dtype = np.dtype([
+        ("genotype_index", np.int64),
+        ("wildtype_letter", "U1"),
+        ("mutation_letter", "U1"),
+        ("binary_repr", "U{}".format(width)),
+        ("binary_index_start", np.int64),
+        ("binary_index_stop", np.int64),
+        ("mutation_index", np.int64),
+        ("site_label", "U{}".format(label_width)),
+    ])
+    array = np.array(rows, dtype=dtype)
+    array.flags.writeable = False
+    return array, encoding_array_to_table(array)
+
+
+def encoding_array_to_table(array):
+    """Build an encoding table (pandas.DataFrame) from its structured array
+    form (see `get_encoding_array`).
+    """
+    # Missing letters and mutation indices are NA.
+    mutation_letter = array["mutation_letter"].astype(object)
+    mutation_letter[mutation_letter == ""] = None
+    mutation_index = np.array(array["mutation_index"], dtype=np.int64)
+
+    return pd.DataFrame(dict(
+        genotype_index=pd.array(array["genotype_index"], dtype="Int64"),
+        wildtype_letter=array["wildtype_letter"].tolist(),
+        mutation_letter=mutation_letter,
+        binary_repr=array["binary_repr"].tolist(),
+        binary_index_start=pd.array(array["binary_index_start"],
+                                    dtype="Int64"),
+        binary_index_stop=pd.array(array["binary_index_stop"], dtype="Int64"),
+        mutation_index=pd.arrays.IntegerArray(mutation_index,
+                                              mutation_index < 0),
+        site_label=array["site_label"].tolist(),
+    ))
+
+
+def encoding_table_to_array(encoding_table):
+    """Convert an encoding table (see `get_encoding_table`) to its read-only
+    structured array form (see `get_encoding_array`). Arrays are returned as
+    they are.
+    """
+    if isinstance(encoding_table, np.ndarray):
+        return encoding_table
 
-            # Create a row for the encoding lookup table.
-            table.append(dict(
-                genotype_index=genotype_index,
-                wildtype_letter=wildtype[genotype_index],
-                mutation_letter=None,
-                binary_repr="",
-                binary_index_start=binary_index_counter,
-                binary_index_stop=binary_index_counter,
-                mutation_index=None,
-                site_label=site_labels[genotype_index]
-            ))
-
-        # Determine mapping for all other sites.
-        else:
-            # copy alphabet to avoid removing items in main object.
-            alphabet_cp = alphabet[:]
-            n = len(alphabet_cp) - 1  # number of mutation neighbors
+    t = encoding_table
+    mutation_letter = np.array(t["mutation_letter"], dtype=object)
+    mutation_letter[pd.isna(mutation_letter)] = ""
+    mutation_index = np.array(t["mutation_index"].fillna(-1), dtype=np.int64)
+    columns = [
+        ("genotype_index", np.array(t["genotype_index"], dtype=np.int64)),
+        ("wildtype_letter", np.array(t["wildtype_letter"], dtype=str)),
+        ("mutation_letter", mutation_letter.astype(str)),
+        ("binary_repr", np.array(t["binary_repr"], dtype=str)),
+        ("binary_index_start", np.array(t["binary_index_start"],
+                                        dtype=np.int64)),
+        ("binary_index_stop", np.array(t["binary_index_stop"],
+                                       dtype=np.int64)),
+        ("mutation_index", mutation_index),
+        ("site_label", np.array(t["site_label"], dtype=str)),
+    ]
+    array = np.empty(len(t), dtype=[(name, values.dtype)
+                                    for name, values in columns])
+    for name, values in columns:
+        array[name] = values
+    array.flags.writeable = False
+    return array
 
-            # Set wildtype state at a given genotype_index.
-            wt_site = wildtype[genotype_index]
-            table.append(dict(
-                genotype_index=genotype_index,
-                wildtype_letter=wt_site,
-                mutation_letter=wt_site,
-                binary_repr="0" * n,
-                binary_index_start=binary_index_counter,
-                binary_index_stop=binary_index_counter + n,
-                mutation_index=None,
-                site_label=site_labels[genotype_index]
-            ))
-
-            # Copy alphabet again to prevent indexing error.
-            alphabet_ = alphabet_cp[:]
-            if wt_site in alphabet_:
-                alphabet_.remove(wt_site)
-
-            # Add all possible mutations at given site
-            for j in range(n):
-                binary_repr = list("0" * n)
-                binary_repr[j] = "1"
-                binary_repr = "".join(binary_repr)
-                table.append(dict(
-                    genotype_index=genotype_index,
-                    wildtype_letter=wt_site,
-                    mutation_letter=alphabet_[j],
-                    binary_repr=binary_repr,
-                    binary_index_start=binary_index_counter,
-                    binary_index_stop=binary_index_counter + n,
-                    mutation_index=mutation_index_counter + 1,
-                    site_label=site_labels[genotype_index]
-                ))
-                mutation_index_counter += 1
-            binary_index_counter += n
-
-    # Turn table into DataFrame.
-    df = pd.DataFrame(table)
-    df.genotype_index = df.genotype_index.astype('Int64')
-    df.mutation_index = df.mutation_index.astype('Int64')
-    df.binary_index_start = df.binary_index_start.astype('Int64')
-    df.binary_index_stop = df.binary_index_stop.astype('Int64')
-    return df
+
+def get_encoding_table(wildtype, mutations, site_labels=None):
+    """This function constructs a lookup table (pandas.DataFrame) for mutations
+    in a given mutations dictionary. This table encodes mutations with a binary representation.
+
+    Tables are cached (see `clear_encoding_cache`); each call returns a copy
+    of the cached table, so it can be modified freely. Use
+    `get_encoding_array` to get the shared, read-only table without copying.
+    """
+    key = _encoding_key(wildtype, mutations, site_labels)
+    return _cached_encoding(key)[1].copy()
+
+
+def get_encoding_array(wildtype, mutations, site_labels=None):
+    """Encoding table (see `get_encoding_table`) as a read-only numpy
+    structured array with the same fields. Sites that don't mutate have an
+    empty mutation_letter, and rows without a mutation have a mutation_index
+    of -1.
+    """
+    key = _encoding_key(wildtype, mutations, site_labels)
+    return _cached_encoding(key)[0]
+
+
+def clear_encoding_cache():
+    """Drop all cached encoding tables."""
+    _cached_encoding.cache_clear()
+
+
+def genotypes_to_array(genotypes):
+    """Convert a list of genotypes into a 2D uint8 array of character codes,
+    with one row per genotype and one column per site.
+    """
+    # Fixed-width bytes are used as is; anything else is converted to str.
+    genotypes = np.asarray(genotypes)
+    if genotypes.dtype.kind != "S":
+        genotypes = genotypes.astype(str)
+    if len(genotypes) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    # Check genotypes are all same length
+    lengths = np.char.str_len(genotypes)
+    length = int(lengths[0])
+    if np.any(lengths != length):
+        raise Exception("Genotypes are not all the same length.")
+
+    if genotypes.dtype == np.dtype("S{}".format(length)):
+        chars = np.ascontiguousarray(genotypes)
+    else:
+        try:
+            chars = genotypes.astype("S{}".format(length))
+        except UnicodeEncodeError:
+            raise ValueError("Genotypes must only contain ASCII characters.")
+
+    return chars.view(np.uint8).reshape(len(genotypes), length)
+
+
+def _check_unknown_letters(arr, unknown, source):
+    """Raise a ValueError listing (a few of) the genotypes in a character
+    array `arr` that have letters flagged in the boolean array `unknown`.
+    """
+    rows, sites = np.nonzero(unknown)
+    if len(rows) == 0:
+        return
+
+    examples = ["{} (site {}, '{}')".format(
+                    bytes(arr[r]).decode(), s, chr(arr[r, s]))
+                for r, s in zip(rows[:5], sites[:5])]
+    raise ValueError("{} genotypes contain letters not found in {}: "
+                     "{}".format(len(np.unique(rows)), source,
+                                 ", ".join(examples)))
+
+
+def get_encoding_lut(encoding_table):
+    """Build a lookup table from an encoding table (see `get_encoding_table`)
+    that maps each site and character code to a column in the binary
+    representation.
+
+    Returns
+    -------
+    lut : numpy.ndarray, shape (n_sites, 256)
+        lut[site, ord(letter)] is the binary column set by `letter` at
+        `site`, -1 if the letter does not set a bit (i.e. the wildtype letter),
+        or -2 if the letter is not in the encoding table.
+    """
+    t = encoding_table
+    site = np.asarray(t["genotype_index"], dtype=np.int64)
+    start = np.asarray(t["binary_index_start"], dtype=np.int64)
+
+    # Non-mutating sites only accept the wildtype letter.
+    letters = np.array(t["mutation_letter"], dtype=object)
+    missing = pd.isna(letters) | (letters == "")
+    letters[missing] = np.asarray(t["wildtype_letter"], dtype=object)[missing]
+    codes = np.array([ord(letter) for letter in letters], dtype=np.int64)
+
+    # Rows for the wildtype letter have no bit set.
+    offset = np.array([binary_repr.find("1")
+                       for binary_repr in t["binary_repr"]], dtype=np.int64)
+
+    lut = np.full((int(site.max()) + 1, 256), -2, dtype=np.int64)
+    lut[site, codes] = np.where(offset < 0, -1, start + offset)
+    return lut
+
+
+def _binary_columns(genotypes, encoding_table):
+    """Map each site of each genotype to the binary column it sets (-1 if
+    none), raising a ValueError if any letter is not in the encoding table.
+    """
+    lut = get_encoding_lut(encoding_table)
+    arr = genotypes_to_array(genotypes)
+    if len(arr) == 0:
+        return np.zeros((0, lut.shape[0]), dtype=np.int64)
+
+    if arr.shape[1] != lut.shape[0]:
+        raise ValueError("Genotypes have {} sites, but the encoding table "
+                         "has {} sites.".format(arr.shape[1], lut.shape[0]))
+
+    columns = lut[np.arange(arr.shape[1]), arr]
+
+    _check_unknown_letters(arr, columns == -2, "the encoding table")
+    return columns
+
+
+def genotypes_to_binary_matrix(genotypes, encoding_table):
+    """Using an encoding table (see `get_encoding_table` function), build the
+    binary representation of a set of genotypes as a 2D array of 0s and 1s.
+
+    Parameters
+    ----------
+    genotypes :
+        List of the genotypes to encode.
+    encoding_table :
+        DataFrame that encodes the binary representation of
+        each mutation in the list of genotypes. (See the
+        `get_encoding_table`).
+
+    Returns
+    -------
+    matrix : numpy.ndarray, dtype uint8, shape (n_genotypes, n_bits)
+        binary representation of each genotype.
+    """
+    columns = _binary_columns(genotypes, encoding_table)
+    n_bits = int(np.max(encoding_table["binary_index_stop"]))
+    matrix = np.zeros((len(columns), n_bits), dtype=np.uint8)
+    rows, sites = np.nonzero(columns >= 0)
+    matrix[rows, columns[rows, sites]] = 1
+    return matrix
+
+
+def genotypes_to_design_matrix(genotypes, encoding_table, sparse=True):
+    """Using an encoding table (see `get_encoding_table` function), build a
+    one-hot design matrix for a set of genotypes, with one column per
+    mutation (ordered by `binary_index_start`).
+
+    Parameters
+    ----------
+    genotypes :
+        List of the genotypes to encode.
+    encoding_table :
+        DataFrame that encodes the binary representation of
+        each mutation in the list of genotypes. (See the
+        `get_encoding_table`).
+    sparse : bool (default=True)
+        If True, return a scipy.sparse CSR matrix. Otherwise, return a dense
+        numpy array.
+
+    Returns
+    -------
+    X : scipy.sparse.csr_matrix or numpy.ndarray, dtype int8
+        design matrix with shape (n_genotypes, n_bits).
+    """
+    columns = _binary_columns(genotypes, encoding_table)
+    n_bits = int(np.max(encoding_table["binary_index_stop"]))
+    shape = (len(columns), n_bits)
+
+    # Each site sets at most one column, and columns increase with sites, so
+    # the row-major nonzero entries are already in CSR order.
+    mask = columns >= 0
+    indices = columns[mask]
+    indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+    np.cumsum(mask.sum(axis=1), out=indptr[1:])
+    data = np.ones(len(indices), dtype=np.int8)
+    X = scipy.sparse.csr_matrix((data, indices, indptr), shape=shape)
+
+    if sparse:
+        return X
+    return X.toarray()
 
 
 def genotypes_to_binary(genotypes, encoding_table):
@@ -233,25 +477,196 @@ def genotypes_to_binary(genotypes, encoding_table):
         each mutation in the list of genotypes. (See the
         `get_encoding_table`).
     """
-    # ---------- Sanity Checks ---------------
-    # 1. Check genotypes are all same length
-    length_of_genotypes = [len(g) for g in genotypes]
-    length = length_of_genotypes[0]
+    matrix = genotypes_to_binary_matrix(genotypes, encoding_table)
+    return matrix_to_binary(matrix).tolist()
 
-    if len(set(length_of_genotypes)) > 1:
-        raise Exception("Genotypes are not all the same length.")
 
-    binary = []
-    # Alias for encoding table
-    t = encoding_table
-    mapper = dict(zip(zip(t.genotype_index, t.mutation_letter), t.binary_repr))
-    for g in genotypes:
-        b = []
-        for genotype_index, mutation_letter in enumerate(g):
-            chunk = mapper[(genotype_index, mutation_letter)]
-            b.append(chunk)
-        binary.append("".join(b))
-    return binary
+def get_state_lut(mutations, wildtype=None):
+    """Build a lookup table that maps each site and character code to the
+    index of that letter in the site's alphabet in a mutations dictionary.
+
+    Sites with a `None` alphabet only accept their wildtype letter (state 0),
+    so `wildtype` must be given if the mutations dictionary has any.
+
+    Returns
+    -------
+    lut : numpy.ndarray, shape (n_sites, 256)
+        lut[site, ord(letter)] is the state of `letter` at `site`, or -1 if the
+        letter is not in the site's alphabet.
+    """
+    lut = np.full((len(mutations), 256), -1, dtype=np.int64)
+    for site, alphabet in mutations.items():
+        site = int(site)
+        if alphabet is None:
+            if wildtype is None:
+                raise ValueError("A wildtype is needed to encode sites that "
+                                 "don't mutate.")
+            alphabet = [wildtype[site]]
+        for state, letter in enumerate(alphabet):
+            lut[site, ord(letter)] = state
+    return lut
+
+
+def genotypes_to_states(genotypes, mutations, wildtype=None):
+    """Convert a list of genotypes into a 2D array of integer states; the
+    state of a site is the index of its letter in that site's alphabet
+    (see `get_state_lut`).
+
+    Returns
+    -------
+    states : numpy.ndarray, dtype uint8, shape (n_genotypes, n_sites)
+        integer-coded genotypes.
+    """
+    lut = get_state_lut(mutations, wildtype=wildtype)
+    arr = genotypes_to_array(genotypes)
+    if len(arr) == 0:
+        return np.zeros((0, lut.shape[0]), dtype=np.uint8)
+
+    if arr.shape[1] != lut.shape[0]:
+        raise ValueError("Genotypes have {} sites, but mutations has {} "
+                         "sites.".format(arr.shape[1], lut.shape[0]))
+
+    states = lut[np.arange(arr.shape[1]), arr]
+
+    _check_unknown_letters(arr, states < 0, "mutations")
+    return states.astype(np.uint8)
+
+
+def states_to_genotypes(states, mutations, wildtype=None, as_bytes=False):
+    """Convert a 2D array of integer states (see `genotypes_to_states`) back
+    into an array of genotypes.
+
+    If `as_bytes` is True, genotypes are returned as a fixed-width bytes
+    array (dtype 'S{length}') instead of strings.
+    """
+    states = np.asarray(states, dtype=np.int64)
+    n_sites = len(mutations)
+
+    # Table of character codes for each site and state.
+    alphabets = []
+    for site in range(n_sites):
+        alphabet = mutations[site]
+        if alphabet is None:
+            if wildtype is None:
+                raise ValueError("A wildtype is needed to decode sites that "
+                                 "don't mutate.")
+            alphabet = [wildtype[site]]
+        alphabets.append(alphabet)
+    letters = np.zeros((n_sites, max(len(a) for a in alphabets)),
+                       dtype=np.uint8)
+    for site, alphabet in enumerate(alphabets):
+        letters[site, :len(alphabet)] = [ord(a) for a in alphabet]
+
+    chars = np.ascontiguousarray(letters[np.arange(n_sites), states])
+    genotypes = chars.view("S{}".format(n_sites)).ravel()
+    if as_bytes:
+        return genotypes
+    return genotypes.astype(str)
+
+
+def hash_states(states):
+    """Hash each row of a 2D array of integer states (see
+    `genotypes_to_states`) to a 64-bit integer.
+    """
+    # Polynomial hash over the sites; integer overflow wraps around.
+    states = np.asarray(states).astype(np.int64).view(np.uint64)
+    keys = np.zeros(len(states), dtype=np.uint64)
+    for column in states.T:
+        keys = keys * np.uint64(1000003) + column + np.uint64(1)
+    return keys
+
+
+# -------------------------------------------------------
+# Packed binary representations
+# -------------------------------------------------------
+
+
+def binary_to_matrix(binary):
+    """Convert a list of binary strings (e.g. '0101') into a 2D uint8 array
+    with one row per genotype and one column per bit.
+    """
+    binary = np.asarray(binary, dtype=str)
+    n = len(binary)
+    if n == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    n_bits = len(binary[0])
+    if n_bits == 0:
+        return np.zeros((n, 0), dtype=np.uint8)
+
+    # View the fixed-width byte strings as a character matrix.
+    chars = binary.astype("S{}".format(n_bits)).view(np.uint8)
+    return chars.reshape(n, n_bits) - ord("0")
+
+
+def matrix_to_binary(matrix):
+    """Convert a 2D array of 0s and 1s (see `binary_to_matrix`) into an array
+    of binary strings.
+    """
+    matrix = np.asarray(matrix, dtype=np.uint8)
+    n, n_bits = matrix.shape
+    if n_bits == 0:
+        return np.array([""] * n, dtype=str)
+
+    chars = np.ascontiguousarray(matrix + ord("0"))
+    return chars.view("S{}".format(n_bits)).ravel().astype(str)
+
+
+def pack_binary(matrix):
+    """Pack a 2D array of 0s and 1s into 64-bit words.
+
+    Bit j of a genotype is stored in word j // 64, counting from the most
+    significant bit, so packed rows sort in the same order as their binary
+    strings.
+
+    Parameters
+    ----------
+    matrix : array-like, shape (n_genotypes, n_bits)
+        binary representation of each genotype.
+
+    Returns
+    -------
+    packed : numpy.ndarray, dtype uint64, shape (n_genotypes, n_words)
+        packed binary representation, with n_words = ceil(n_bits / 64).
+    """
+    matrix = np.asarray(matrix, dtype=np.uint8)
+    n, n_bits = matrix.shape
+    n_words = -(-n_bits // 64)
+
+    # Pad to a whole number of words and pack 8 bits per byte.
+    padded = np.zeros((n, n_words * 64), dtype=np.uint8)
+    padded[:, :n_bits] = matrix
+    packed = np.packbits(padded, axis=1)
+
+    # Reinterpret each group of 8 bytes as a big-endian word.
+    return packed.view(">u8").astype(np.uint64)
+
+
+def unpack_binary(packed, n_bits):
+    """Unpack 64-bit words (see `pack_binary`) into a 2D array of 0s and 1s
+    with `n_bits` columns.
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    n = packed.shape[0]
+    chars = np.ascontiguousarray(packed.astype(">u8")).view(np.uint8)
+    matrix = np.unpackbits(chars.reshape(n, -1), axis=1)
+    return matrix[:, :n_bits]
+
+
+def popcount(packed):
+    """Count the number of set bits in each element of an unsigned integer
+    array.
+    """
+    packed = np.asarray(packed)
+    # Use numpy's builtin when available (numpy >= 2.0).
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(packed).astype(np.int64)
+
+    # Otherwise, count bits byte-by-byte using a lookup table.
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+    chars = np.ascontiguousarray(packed).view(np.uint8)
+    counts = table[chars].reshape(packed.shape + (packed.itemsize,))
+    return counts.sum(axis=-1)
 
 
 def mutations_to_encoding(wildtype, mutations):
@@ -337,22 +752,26 @@ def mutations_to_genotypes(mutations, wildtype=None):
 def genotypes_to_mutations(genotypes):
     """Create mutations dictionary from a list of mutations.
     """
-    # Sequences to array
-    arr = np.array([list(g) for g in genotypes])
+    # Sequences to array of character codes
+    arr = genotypes_to_array(genotypes)
 
     # Mutations dict
     mutations = {i: None for i in range(arr.shape[1])}
 
     # Find unique residues at all sites.
     for i, col in enumerate(arr.T):
-        mutations[i] = list(np.unique(col))
+        mutations[i] = [chr(c) for c in np.unique(col)]
 
     return mutations
 
 
-def get_missing_genotypes(genotypes, mutations=None):
+def get_missing_genotypes(genotypes, mutations=None, lazy=False):
     """Get a list of genotypes not found in the given genotypes list.
 
+    Observed genotypes are ranked in the complete genotype space (see
+    `gpmap.space.GenotypeSpace`) and marked in a bitmap, so the space is
+    never enumerated as strings.
+
     Parameters
     ----------
     genotypes : list
@@ -361,23 +780,31 @@ def get_missing_genotypes(genotypes, mutations=None):
     mutations : dict (optional)
         Mutation dictionary
 
+    lazy : bool (default=False)
+        If True, return a generator that decodes missing genotypes in chunks.
+
     Return
     ------
     missing_genotypes : list
         List of genotypes not found in genotypes list.
     """
+    from gpmap.space import GenotypeSpace
+
     if mutations is None:
         mutations = genotypes_to_mutations(genotypes)
 
-    # Need a wildtype--doesn't matter what it is.
-    wildtype = "".join([sites[0] for sites in mutations.values()])
+    # Need a wildtype--doesn't matter what it is, except at sites that don't
+    # mutate.
+    wildtype = "".join([genotypes[0][int(i)] if sites is None else sites[0]
+                        for i, sites in mutations.items()])
 
-    # Get all genotypes.
-    all_genotypes = mutations_to_genotypes(mutations, wildtype)
+    space = GenotypeSpace(mutations, wildtype=wildtype)
+    if lazy:
+        return space.iter_missing(genotypes)
 
     # Find genotypes not found in genotypes list.
-    missing_genotypes = set(all_genotypes).difference(set(genotypes))
-    return list(missing_genotypes)
+    missing_ranks = space.missing_ranks(genotypes)
+    return space.unrank(missing_ranks).tolist()
 
 
 def length_to_mutations(length, alphabet=["0", "1"]):
@@ -0,0 +1,48 @@
+import pytest
+
+from gpmap import utils, distance
+
+import numpy as np
+from scipy.spatial.distance import pdist, cdist
+
+
+@pytest.fixture(scope="module")
+def genotypes():
+    """Random integer-coded genotypes."""
+    return np.random.randint(0, 4, size=(37, 20)).astype(np.uint8)
+
+
+def test_hamming_to_many(genotypes):
+    """Test one-to-many distances."""
+    expected = [sum(a != b for a, b in zip(genotypes[0], g))
+                for g in genotypes]
+    assert list(distance.hamming_to_many(genotypes[0], genotypes)) == expected
+
+
+def test_hamming_cdist(genotypes):
+    """Test blocked many-to-many distances against scipy."""
+    expected = cdist(genotypes[:10], genotypes, metric="hamming") * 20
+    result = distance.hamming_cdist(genotypes[:10], genotypes, block_size=4)
+    assert np.array_equal(result, np.rint(expected))
+
+
+def test_hamming_pdist(genotypes):
+    """Test blocked condensed distances and their distribution."""
+    expected = np.rint(pdist(genotypes, metric="hamming") * 20)
+    result = distance.hamming_pdist(genotypes, block_size=8)
+    assert np.array_equal(result, expected)
+
+    counts = distance.hamming_counts(genotypes, block_size=8)
+    assert np.array_equal(counts, np.bincount(result))
+
+
+def test_packed_distances():
+    """Test XOR-popcount distances over packed binary genotypes."""
+    matrix = np.random.randint(0, 2, size=(15, 130)).astype(np.uint8)
+    packed = utils.pack_binary(matrix)
+    expected = distance.hamming_pdist(matrix)
+    assert np.array_equal(distance.hamming_pdist(packed, packed=True,
+                                                 block_size=4), expected)
+    assert np.array_equal(distance.hamming_to_many(packed[3], packed,
+                                                   packed=True),
+                          distance.hamming_to_many(matrix[3], matrix))
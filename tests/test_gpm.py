@@ -105,6 +105,25 @@ def test_read_csv(test_csv):
     assert isinstance(read_gpm, GenotypePhenotypeMap)
 
 
+def test_read_csv_chunks(test_csv):
+    """
+    Test reading from csv in chunks matches reading all at once.
+    """
+    gpm = GenotypePhenotypeMap.read_csv(test_csv, wildtype='AAA')
+    for kwargs in [dict(), dict(mutations=gpm.mutations),
+                   dict(genotype_dtype="bytes", packed=True)]:
+        read = GenotypePhenotypeMap.read_csv(test_csv, wildtype='AAA',
+                                             chunksize=3, **kwargs)
+        assert read.mutations == gpm.mutations
+        assert list(read.genotypes.astype(str)) == list(gpm.genotypes)
+        assert np.array_equal(read.phenotypes, gpm.phenotypes)
+        assert np.array_equal(read.stdeviations, gpm.stdeviations,
+                              equal_nan=True)
+        assert np.array_equal(read.n_replicates, gpm.n_replicates)
+        assert np.array_equal(read.binary, gpm.binary)
+        assert np.array_equal(read.n_mutations, gpm.n_mutations)
+
+
 def test_data_integrity_csv(binary_test_data,tmp_path):
     """
     Write to a csv and make sure it reads back in properly.
@@ -166,3 +185,673 @@ def test_missing_genotypes(binary_test_data):
     assert np.array_equal(gpm_missing_g.genotypes, chosen_g)
     assert np.array_equal(np.sort(gpm_missing_g.get_missing_genotypes()),
                           np.sort(missing_g))
+
+
+def test_packed_binary(mixed_test_data):
+    """
+    Test that the packed binary store matches the string representation.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+
+    gpm_packed = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                                      genotypes=mixed_test_data["genotypes"],
+                                      phenotypes=mixed_test_data["phenotypes"],
+                                      packed=True)
+
+    assert "binary" not in gpm_packed.data
+    assert gpm_packed.packed_binary.dtype == np.uint64
+    assert np.array_equal(gpm_packed.packed_binary, gpm.packed_binary)
+    assert np.array_equal(gpm_packed.binary, gpm.binary)
+    assert np.array_equal(gpm_packed.data.n_mutations, gpm.data.n_mutations)
+
+
+def test_state_matrix(mixed_test_data):
+    """
+    Test the cached integer-coded genotype matrix.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+
+    states = gpm.state_matrix
+    assert states.shape == (12, 3)
+    assert states[5].tolist() == [0, 1, 2]
+    assert gpm.state_matrix is states
+
+    # Replacing the data drops the cache.
+    gpm.data = gpm.data.iloc[::-1].reset_index(drop=True)
+    assert gpm.state_matrix[-6].tolist() == [0, 1, 2]
+
+
+def test_design_matrix(mixed_test_data):
+    """
+    Test the one-hot design matrix matches the binary representation.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+
+    X = gpm.get_design_matrix()
+    assert X.format == "csr"
+    assert X.dtype == np.int8
+    assert X.shape == (12, 4)
+
+    dense = gpm.get_design_matrix(sparse=False)
+    assert np.array_equal(X.toarray(), dense)
+    binary = ["".join(str(b) for b in row) for row in dense]
+    assert binary == mixed_test_data["binary"]
+
+
+def test_hamming_to(mixed_test_data):
+    """
+    Test n_mutations and Hamming distances to a reference genotype.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+
+    n_mutations = [b.count("1") for b in mixed_test_data["binary"]]
+    assert list(gpm.data.n_mutations) == n_mutations
+    assert list(gpm.hamming_to()) == n_mutations
+
+    expected = [utils.hamming_distance("BBC", g) for g in gpm.genotypes]
+    assert list(gpm.hamming_to("BBC")) == expected
+
+
+def test_locate(mixed_test_data):
+    """
+    Test looking up rows of genotypes in the map.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+
+    assert gpm.locate("ABC") == 5
+    assert list(gpm.locate(["BBC", "AAA", "CCC", "AAB"])) == [11, 0, -1, 1]
+    assert list(gpm.locate(mixed_test_data["genotypes"])) == list(range(12))
+
+
+def test_locate_large_space():
+    """
+    Test looking up rows when the genotype space doesn't fit in 64 bits.
+    """
+
+    wildtype = "A" * 40
+    genotypes = [wildtype, "C" + "A" * 39, "A" * 39 + "T"]
+    mutations = {i: utils.DNA for i in range(40)}
+    gpm = GenotypePhenotypeMap(wildtype, genotypes, mutations=mutations)
+
+    assert list(gpm.locate(genotypes[::-1] + ["G" * 40])) == [2, 1, 0, -1]
+
+
+def test_neighbor_graph(mixed_test_data):
+    """
+    Test the single-mutation neighbor graph against pairwise distances.
+    """
+
+    # Drop a few genotypes to make the map incomplete.
+    genotypes = mixed_test_data["genotypes"][:-3]
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=genotypes,
+                               mutations=mixed_test_data["mutations"])
+
+    graph = gpm.get_neighbor_graph()
+    assert graph.format == "csr"
+    assert graph.shape == (9, 9)
+
+    expected = [[int(utils.hamming_distance(g1, g2) == 1) for g2 in genotypes]
+                for g1 in genotypes]
+    assert graph.toarray().tolist() == expected
+
+
+def test_genotype_dtype(mixed_test_data, test_csv):
+    """
+    Test storing genotypes as fixed-width bytes or a categorical column.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+
+    gpm_bytes = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                                     genotypes=mixed_test_data["genotypes"],
+                                     phenotypes=mixed_test_data["phenotypes"],
+                                     genotype_dtype="bytes")
+
+    assert gpm_bytes.genotypes.dtype == np.dtype("S3")
+    assert gpm_bytes._data is None
+    chars = utils.genotypes_to_array(gpm_bytes.genotypes)
+    assert np.shares_memory(chars, gpm_bytes.genotypes)
+    assert np.array_equal(gpm_bytes.binary, gpm.binary)
+    assert np.array_equal(gpm_bytes.state_matrix, gpm.state_matrix)
+    assert list(gpm_bytes.data.genotypes) == mixed_test_data["genotypes"]
+
+    gpm_cat = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                                   genotypes=mixed_test_data["genotypes"],
+                                   genotype_dtype="category")
+    assert gpm_cat.data.genotypes.dtype == "category"
+    assert np.array_equal(gpm_cat.binary, gpm.binary)
+
+    gpm_csv = GenotypePhenotypeMap.read_csv(test_csv, wildtype="AAA",
+                                            genotype_dtype="bytes")
+    assert gpm_csv.genotypes.dtype == np.dtype("S3")
+
+
+def test_lazy_data(binary_test_data):
+    """
+    Test that data is only built when requested and stays in sync.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=binary_test_data["wildtype"],
+                               genotypes=binary_test_data["genotypes"],
+                               phenotypes=binary_test_data["phenotypes"])
+
+    assert gpm._data is None
+    assert list(gpm.phenotypes) == binary_test_data["phenotypes"]
+    assert list(gpm.binary) == binary_test_data["binary"]
+    assert list(gpm.index) == list(range(8))
+
+    gpm.phenotypes = np.zeros(8)
+    assert gpm._data is None
+
+    data = gpm.data
+    assert list(data.columns) == ["genotypes", "phenotypes", "n_replicates",
+                                  "stdeviations", "binary", "n_mutations"]
+    assert np.all(data.phenotypes == 0)
+
+    # Once built, the DataFrame holds the data.
+    gpm.data["phenotypes"] = 1.0
+    assert np.all(gpm.phenotypes == 1)
+    gpm.phenotypes = np.arange(8)
+    assert list(gpm.data.phenotypes) == list(range(8))
+
+
+def test_from_arrays(mixed_test_data):
+    """
+    Test constructing a map from precomputed arrays.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"],
+                               mutations=mixed_test_data["mutations"])
+
+    # Reuse everything.
+    gpm_arrays = GenotypePhenotypeMap.from_arrays(
+        gpm.wildtype, gpm.genotypes, gpm.mutations,
+        phenotypes=gpm.phenotypes,
+        encoding_table=gpm.encoding_table,
+        packed_binary=gpm.packed_binary,
+        n_mutations=gpm.n_mutations)
+    _compare_gpmap(gpm, gpm_arrays)
+    assert gpm_arrays.encoding_table.equals(gpm.encoding_table)
+    assert gpm_arrays.packed_binary is gpm.packed_binary
+    assert np.array_equal(gpm_arrays.n_mutations, gpm.n_mutations)
+
+    # Binary strings or a matrix; everything else is derived.
+    matrix = utils.binary_to_matrix(mixed_test_data["binary"])
+    for binary in [mixed_test_data["binary"], matrix]:
+        gpm_arrays = GenotypePhenotypeMap.from_arrays(
+            gpm.wildtype, gpm.genotypes, gpm.mutations,
+            phenotypes=gpm.phenotypes,
+            binary=binary,
+            packed=True)
+        assert np.array_equal(gpm_arrays.packed_binary, gpm.packed_binary)
+        assert np.array_equal(gpm_arrays.binary, gpm.binary)
+        assert np.array_equal(gpm_arrays.n_mutations, gpm.n_mutations)
+
+    # Inconsistent inputs are caught unless validation is skipped.
+    with pytest.raises(ValueError):
+        GenotypePhenotypeMap.from_arrays(gpm.wildtype, gpm.genotypes,
+                                         gpm.mutations,
+                                         packed_binary=gpm.packed_binary,
+                                         n_mutations=np.zeros(gpm.n))
+    with pytest.raises(ValueError):
+        GenotypePhenotypeMap.from_arrays(gpm.wildtype, ["AAD"] * gpm.n,
+                                         gpm.mutations,
+                                         packed_binary=gpm.packed_binary)
+    GenotypePhenotypeMap.from_arrays(gpm.wildtype, gpm.genotypes,
+                                     gpm.mutations,
+                                     packed_binary=gpm.packed_binary,
+                                     n_mutations=np.zeros(gpm.n),
+                                     validate=False)
+
+
+def test_add_remove_genotypes(mixed_test_data):
+    """
+    Test adding and removing genotypes in place.
+    """
+
+    genotypes = mixed_test_data["genotypes"]
+    phenotypes = mixed_test_data["phenotypes"]
+
+    for packed in [False, True]:
+        gpm = GenotypePhenotypeMap(wildtype="AAA",
+                                   genotypes=genotypes[:6],
+                                   phenotypes=phenotypes[:6],
+                                   packed=packed)
+        gpm.locate("AAA")
+        gpm.data
+
+        # New letters extend the mutations and encoding.
+        gpm.add_genotypes(genotypes[6:], phenotypes=phenotypes[6:])
+        full = GenotypePhenotypeMap(wildtype="AAA",
+                                    genotypes=genotypes,
+                                    phenotypes=phenotypes,
+                                    mutations=gpm.mutations)
+        _compare_gpmap(gpm, full)
+        assert np.array_equal(gpm.packed_binary, full.packed_binary)
+        assert np.array_equal(gpm.n_mutations, full.n_mutations)
+        assert list(gpm.data.phenotypes) == phenotypes
+
+        # Known letters only encode the new rows.
+        gpm.add_genotypes(["AAB"], phenotypes=[1.0])
+        assert gpm.n == 13
+        assert gpm.locate("BBC") == 11
+        assert gpm.locate("AAB") == 1
+        assert gpm.binary[-1] == gpm.binary[1]
+
+        gpm.remove_genotypes(["AAB", "BBC"])
+        assert gpm.n == 10
+        assert gpm.locate("AAB") == -1
+        assert gpm.locate("BAC") == 7
+        assert np.array_equal(gpm.packed_binary,
+                              full.packed_binary[[0, 2, 3, 4, 5, 6, 7, 8, 9, 10]])
+
+        with pytest.raises(ValueError):
+            gpm.remove_genotypes("AAB")
+        with pytest.raises(ValueError):
+            gpm.add_genotypes(["AAAA"])
+
+    # Missing standard deviations are NaN if the map has any.
+    gpm = GenotypePhenotypeMap("AAA", ["AAA", "AAB"], stdeviations=[.1, .2])
+    gpm.add_genotypes(["ABA"])
+    assert np.isnan(gpm.stdeviations[-1])
+    assert np.isnan(gpm.err.upper[-1])
+
+    gpm = GenotypePhenotypeMap("AAA", ["AAA", "AAB"])
+    gpm.add_genotypes(["ABA"])
+    assert list(gpm.stdeviations) == [None] * 3
+
+
+def test_encoding_table_not_shared(mixed_test_data):
+    """
+    Test that changing one map's encoding table doesn't change other maps.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"])
+    n_bits = gpm.n_bits
+    gpm.encoding_table["binary_index_stop"] = 99
+    assert gpm.n_bits == 99
+
+    new = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"])
+    assert new.n_bits == n_bits
+    assert new.encoding_table["binary_index_stop"].max() == n_bits
+
+
+def test_edit_data_in_place(mixed_test_data):
+    """
+    Test that editing data in place keeps the genotypes and derived arrays
+    in sync with it.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+    gpm.locate("AAA")
+
+    gpm.data.drop(index=0, inplace=True)
+    assert gpm.n == len(gpm.data) == len(mixed_test_data["genotypes"]) - 1
+    assert list(gpm.genotypes) == mixed_test_data["genotypes"][1:]
+    assert len(gpm.packed_binary) == gpm.n
+    assert gpm.locate("AAA") == -1
+
+    gpm.data.sort_values("phenotypes", inplace=True)
+    order = np.argsort(mixed_test_data["phenotypes"][1:], kind="stable")
+    genotypes = np.array(mixed_test_data["genotypes"][1:])[order]
+    assert list(gpm.genotypes) == list(genotypes)
+    assert list(gpm.genotypes) == list(gpm.data.genotypes)
+    rebuilt = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                                   genotypes=genotypes,
+                                   mutations=gpm.mutations)
+    assert np.array_equal(gpm.packed_binary, rebuilt.packed_binary)
+    assert gpm.locate(genotypes[0]) == 0
+
+
+def test_subset(mixed_test_data):
+    """
+    Test taking a subset of a map's rows.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"])
+    gpm.state_matrix
+
+    rows = [1, 4, 5, 11]
+    mask = np.zeros(gpm.n, dtype=bool)
+    mask[rows] = True
+    for index in [rows, mask]:
+        sub = gpm.subset(index)
+        assert sub.encoding_table.equals(gpm.encoding_table)
+        assert list(sub.genotypes) == list(gpm.genotypes[rows])
+        assert np.array_equal(sub.phenotypes, gpm.phenotypes[rows])
+        assert np.array_equal(sub.packed_binary, gpm.packed_binary[rows])
+        assert np.array_equal(sub.state_matrix, gpm.state_matrix[rows])
+        assert list(sub.index) == [0, 1, 2, 3]
+        assert sub.locate("ABC") == 2
+
+    # Slices are views; setting a column doesn't change the parent.
+    sub = gpm.subset(slice(2, 6))
+    assert np.shares_memory(sub.packed_binary, gpm.packed_binary)
+    sub.phenotypes = 0.0
+    assert gpm.phenotypes[2] == mixed_test_data["phenotypes"][2]
+    assert list(sub.data.genotypes) == mixed_test_data["genotypes"][2:6]
+
+    # Editing a subset in place doesn't change the parent either.
+    phenotypes = np.array(gpm.phenotypes)
+    for index in [slice(2, 6), [2, 3, 4, 5]]:
+        sub = gpm.subset(index)
+        sub.phenotypes[0] = 1.0
+        assert sub.phenotypes[0] == 1.0
+        sub.data.loc[0, "phenotypes"] = 99.0
+        sub.data.loc[1, "genotypes"] = "AAA"
+        assert sub.data.phenotypes[0] == 99.0
+        assert np.array_equal(gpm.phenotypes, phenotypes)
+        assert list(gpm.genotypes) == mixed_test_data["genotypes"]
+
+    with pytest.raises(ValueError):
+        gpm.subset(mask[:-1])
+
+
+def test_mask_simulation():
+    """
+    Test masking a simulated map slices the simulation's per-row arrays.
+    """
+    from gpmap.simulate import MountFujiSimulation
+    from gpmap.simulate.mask import mask
+
+    gpm = MountFujiSimulation.from_length(4, field_strength=2,
+                                          roughness_width=0.1)
+    frac, sub = mask(gpm, 0.5)
+    assert frac == 0.5
+    assert isinstance(sub, MountFujiSimulation)
+    assert len(sub.hamming) == len(sub.roughness) == sub.n == 8
+    assert np.array_equal(sub.hamming, sub.hamming_to())
+    phenotypes = np.array(sub.phenotypes)
+    sub.build()
+    assert np.allclose(sub.phenotypes, phenotypes)
+
+
+def test_set_wildtype(mixed_test_data):
+    """
+    Test that changing the wildtype matches building the map from scratch.
+    """
+
+    for packed in [False, True]:
+        gpm = GenotypePhenotypeMap(wildtype="AAA",
+                                   genotypes=mixed_test_data["genotypes"],
+                                   phenotypes=mixed_test_data["phenotypes"],
+                                   mutations=mixed_test_data["mutations"],
+                                   packed=packed)
+        gpm.locate("AAA")
+
+        for wildtype in ["BAA", "BBC", "ABB", "AAA"]:
+            gpm.wildtype = wildtype
+            new = GenotypePhenotypeMap(wildtype=wildtype,
+                                       genotypes=mixed_test_data["genotypes"],
+                                       phenotypes=mixed_test_data["phenotypes"],
+                                       mutations=mixed_test_data["mutations"])
+            assert gpm.encoding_table.equals(new.encoding_table)
+            assert np.array_equal(gpm.packed_binary, new.packed_binary)
+            assert np.array_equal(gpm.binary, new.binary)
+            assert np.array_equal(gpm.n_mutations, new.n_mutations)
+            assert gpm.locate(wildtype) == new.locate(wildtype)
+
+    with pytest.raises(ValueError):
+        gpm.wildtype = "AAD"
+    with pytest.raises(ValueError):
+        gpm.wildtype = "AA"
+
+
+@pytest.mark.parametrize("fmt", ["npz", "parquet"])
+def test_binary_formats(mixed_test_data, tmp_path, fmt):
+    """
+    Test round trips through the npz and parquet formats.
+    """
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+
+    filename = str(tmp_path / "map.{}".format(fmt))
+    options = [dict(), dict(packed=True, genotype_dtype="bytes"),
+               dict(stdeviations=mixed_test_data["errors"])]
+    for kwargs in options:
+        gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                                   genotypes=mixed_test_data["genotypes"],
+                                   phenotypes=mixed_test_data["phenotypes"],
+                                   site_labels=[3, 5, 7],
+                                   label="test",
+                                   **kwargs)
+        getattr(gpm, "to_" + fmt)(filename)
+        read = getattr(GenotypePhenotypeMap, "read_" + fmt)(filename)
+
+        _compare_gpmap(gpm, read)
+        assert read.genotypes.dtype == gpm.genotypes.dtype
+        assert read.metadata == {"label": "test"}
+        assert list(read.encoding_table.site_label) == \
+            list(gpm.encoding_table.site_label)
+        assert np.array_equal(read.packed_binary, gpm.packed_binary)
+        assert np.array_equal(read.n_mutations, gpm.n_mutations)
+        assert read._packed == gpm._packed
+
+    # npz files store the encoding table, which is read back.
+    if fmt == "npz":
+        gpm.encoding_table["mutation_index"] += 10
+        gpm.to_npz(filename)
+        read = GenotypePhenotypeMap.read_npz(filename)
+        assert read.encoding_table.equals(gpm.encoding_table)
+
+
+def test_mmap(mixed_test_data, tmp_path):
+    """
+    Test writing a map to disk and opening it memory-mapped.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"],
+                               stdeviations=mixed_test_data["errors"])
+    path = str(tmp_path / "map")
+    gpm.to_mmap(path)
+
+    read = GenotypePhenotypeMap.open_mmap(path)
+    assert isinstance(read.genotypes.base, np.memmap)
+    assert isinstance(read.packed_binary.base, np.memmap)
+    assert not read.phenotypes.flags.writeable
+    assert list(read.genotypes.astype(str)) == mixed_test_data["genotypes"]
+    assert np.array_equal(read.phenotypes, gpm.phenotypes)
+    assert np.array_equal(read.stdeviations, gpm.stdeviations)
+    assert np.array_equal(read.binary, gpm.binary)
+    assert read.locate("BBC") == 11
+
+    # Write changes back to disk.
+    read = GenotypePhenotypeMap.open_mmap(path, mode="r+")
+    read.phenotypes[0] = 10.0
+    del read
+    read = GenotypePhenotypeMap.open_mmap(path, validate=True)
+    assert read.phenotypes[0] == 10.0
+
+    # The stored encoding table is read back.
+    assert read.encoding_table.equals(gpm.encoding_table)
+    gpm.encoding_table["mutation_index"] += 10
+    gpm.to_mmap(path)
+    read = GenotypePhenotypeMap.open_mmap(path)
+    assert read.encoding_table.equals(gpm.encoding_table)
+
+
+def test_jsonl(mixed_test_data, tmp_path):
+    """
+    Test writing and reading JSON-Lines files.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"],
+                               stdeviations=mixed_test_data["errors"],
+                               label="test")
+    filename = str(tmp_path / "map.jsonl")
+
+    for chunksize in [None, 5]:
+        gpm.to_jsonl(filename, chunksize=chunksize)
+        with open(filename) as f:
+            lines = f.readlines()
+        assert len(lines) == 1 + (12 if chunksize is None else 3)
+
+        read = GenotypePhenotypeMap.read_jsonl(filename, chunksize=4)
+        _compare_gpmap(gpm, read)
+        assert read.metadata == {"label": "test"}
+        assert np.array_equal(read.packed_binary, gpm.packed_binary)
+
+    # Append more records to the file.
+    gpm.subset(slice(0, 2)).to_jsonl(filename, mode="a")
+    read = GenotypePhenotypeMap.read_jsonl(filename, genotype_dtype="bytes")
+    assert read.n == 14
+    assert list(read.genotypes[-2:]) == [b"AAA", b"AAB"]
+
+
+def test_from_dict_reuses_encoding(mixed_test_data, monkeypatch):
+    """
+    Test that dictionaries keep their mutations and binary representation.
+    """
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"],
+                               site_labels=[3, 5, 7],
+                               label="test")
+    json_str = gpm.to_json()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Genotypes were encoded again.")
+
+    with monkeypatch.context() as m:
+        m.setattr(utils, "genotypes_to_binary_matrix", fail)
+        m.setattr(utils, "genotypes_to_mutations", fail)
+        read = GenotypePhenotypeMap.from_json(json_str)
+
+    _compare_gpmap(gpm, read)
+    assert read.metadata == {"label": "test"}
+    assert read.encoding_table.equals(gpm.encoding_table)
+
+    # A different wildtype can't use the stored binary.
+    read = GenotypePhenotypeMap.from_json(json_str, wildtype="BBA")
+    assert read.binary[0] == "1100"
+
+    # Stored data is checked.
+    metadata = gpm.to_dict()
+    metadata["data"]["binary"][0] = "00001"
+    with pytest.raises(ValueError):
+        GenotypePhenotypeMap.from_dict(metadata)
+
+    # Including binary that doesn't match the genotypes.
+    metadata = gpm.to_dict()
+    binary = metadata["data"]["binary"]
+    binary[1], binary[2] = binary[2], binary[1]
+    with pytest.raises(ValueError):
+        GenotypePhenotypeMap.from_dict(metadata)
+
+
+def test_pickle(mixed_test_data, tmp_path):
+    """
+    Test pickling maps with a compact state.
+    """
+    import pickle
+    from gpmap.simulate import MountFujiSimulation
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"],
+                               label="test")
+    gpm.data
+
+    state = gpm.__getstate__()
+    assert "_data" not in state and "_encoding" not in state
+    assert state["_columns"]["binary"] is None
+
+    # Arrays are sent out-of-band with protocol 5.
+    buffers = []
+    dumped = pickle.dumps(gpm, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) > 0
+    read = pickle.loads(dumped, buffers=buffers)
+    _compare_gpmap(gpm, read)
+    assert read.metadata == {"label": "test"}
+    assert read.encoding_table.equals(gpm.encoding_table)
+    assert list(read.data.columns) == list(gpm.data.columns)
+
+    # Subclasses keep their attributes.
+    sim = MountFujiSimulation.from_length(3, field_strength=2)
+    filename = str(tmp_path / "sim.pickle")
+    sim.to_pickle(filename)
+    read = GenotypePhenotypeMap.read_pickle(filename)
+    assert isinstance(read, MountFujiSimulation)
+    assert read.field_strength == 2
+    assert np.array_equal(read.phenotypes, sim.phenotypes)
+
+    # Changed encoding tables are kept.
+    gpm.encoding_table["mutation_index"] += 10
+    read = pickle.loads(pickle.dumps(gpm))
+    assert read.encoding_table.equals(gpm.encoding_table)
+
+
+def test_read_legacy_pickle(mixed_test_data, tmp_path):
+    """
+    Test reading pickles whose state is the map's attributes, including the
+    data DataFrame, as written by older versions.
+    """
+    import copyreg
+    import pickle
+    import pandas as pd
+
+    gpm = GenotypePhenotypeMap(wildtype=mixed_test_data["wildtype"],
+                               genotypes=mixed_test_data["genotypes"],
+                               phenotypes=mixed_test_data["phenotypes"],
+                               stdeviations=mixed_test_data["errors"],
+                               site_labels=[3, 5, 7],
+                               label="test")
+    state = dict(_mutations=gpm.mutations,
+                 _wildtype=gpm.wildtype,
+                 metadata=gpm.metadata,
+                 data=pd.DataFrame(dict(genotypes=gpm.genotypes,
+                                        phenotypes=gpm.phenotypes,
+                                        n_replicates=gpm.n_replicates,
+                                        stdeviations=gpm.stdeviations,
+                                        binary=gpm.binary,
+                                        n_mutations=gpm.n_mutations)),
+                 encoding_table=gpm.encoding_table,
+                 std=gpm.std,
+                 err=gpm.err)
+
+    class Legacy(object):
+        def __reduce__(self):
+            return (copyreg._reconstructor,
+                    (GenotypePhenotypeMap, object, None), state)
+
+    filename = str(tmp_path / "legacy.pickle")
+    with open(filename, "wb") as f:
+        pickle.dump(Legacy(), f)
+    read = GenotypePhenotypeMap.read_pickle(filename)
+    _compare_gpmap(gpm, read)
+    assert read.metadata == {"label": "test"}
+    assert read.encoding_table.equals(gpm.encoding_table)
+    assert np.array_equal(read.packed_binary, gpm.packed_binary)
+    assert np.array_equal(read.err.upper, gpm.err.upper)
+    assert read.locate("BBC") == 11
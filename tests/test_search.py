@@ -0,0 +1,68 @@
+import pytest
+
+from gpmap import GenotypePhenotypeMap, utils
+from gpmap.search import HammingIndex
+
+import numpy as np
+
+
+@pytest.fixture(scope="module")
+def gpm():
+    """Random incomplete map of DNA genotypes."""
+    genotypes = np.unique(["".join(g) for g in
+                           np.random.choice(utils.DNA, size=(300, 12))])
+    mutations = {i: utils.DNA for i in range(12)}
+    return GenotypePhenotypeMap(genotypes[0], genotypes, mutations=mutations)
+
+
+def _brute_force(gpm, query):
+    return np.array([utils.hamming_distance(query, g) for g in gpm.genotypes])
+
+
+def test_radius(gpm):
+    """Test radius queries against a linear scan."""
+    index = HammingIndex(gpm, n_blocks=4)
+    queries = [gpm.genotypes[5], "ACGTACGTACGT", "NNNNACGTACGT"]
+    for radius in [0, 2, 3, 6]:
+        rows, distances = index.radius(queries, radius)
+        for query, r, d in zip(queries, rows, distances):
+            expected = _brute_force(gpm, query)
+            assert set(r) == set(np.flatnonzero(expected <= radius))
+            assert np.array_equal(d, expected[r])
+            assert np.all(np.diff(d) >= 0)
+
+
+def test_knn(gpm):
+    """Test k-nearest neighbor queries against a linear scan."""
+    index = HammingIndex(gpm)
+    queries = [gpm.genotypes[0], "ACGTACGTACGT"]
+    rows, distances = index.knn(queries, k=5)
+    assert rows.shape == (2, 5)
+    assert rows[0, 0] == 0 and distances[0, 0] == 0
+    for query, d in zip(queries, distances):
+        expected = np.sort(_brute_force(gpm, query))[:5]
+        assert np.array_equal(d, expected)
+
+    with pytest.raises(ValueError):
+        index.knn(queries, k=0)
+
+
+def test_radius_around_wildtype():
+    """Test radius queries on a map of single and double mutants."""
+    wildtype = "AAAAAAAAAA"
+    genotypes = [wildtype]
+    for i in range(10):
+        for a in "CGT":
+            genotypes.append(wildtype[:i] + a + wildtype[i + 1:])
+            j = (i + 3) % 10
+            genotypes.append(genotypes[-1][:j] + "C" + genotypes[-1][j + 1:])
+    mutations = {i: utils.DNA for i in range(10)}
+    gpm = GenotypePhenotypeMap(wildtype, genotypes, mutations=mutations)
+
+    index = HammingIndex(gpm, n_blocks=2)
+    queries = [genotypes[4], genotypes[9], "GGAAAAAAAA"]
+    for radius in [1, 2, 3]:
+        rows, distances = index.radius(queries, radius)
+        for query, r in zip(queries, rows):
+            expected = _brute_force(gpm, query)
+            assert set(r) == set(np.flatnonzero(expected <= radius))
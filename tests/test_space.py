@@ -0,0 +1,93 @@
+import pytest
+
+from gpmap import utils
+from gpmap.space import GenotypeSpace
+
+import numpy as np
+
+MUTATIONS = {
+    0: ["A", "B"],
+    1: None,
+    2: ["A", "B", "C"],
+}
+
+
+def test_size():
+    """Test the size of a genotype space."""
+    space = GenotypeSpace(MUTATIONS, wildtype="AAA")
+    assert space.size == 6
+    assert len(space) == 6
+    assert list(space.radices) == [2, 1, 3]
+
+
+def test_rank_unrank():
+    """Test ranking matches the order of mutations_to_genotypes."""
+    space = GenotypeSpace(MUTATIONS, wildtype="AAA")
+    genotypes = utils.mutations_to_genotypes(MUTATIONS, wildtype="AAA")
+
+    assert list(space.rank(genotypes)) == list(range(6))
+    assert list(space.unrank(np.arange(6))) == genotypes
+    assert space.rank("BAC") == 5
+    assert space.unrank(5) == "BAC"
+    assert list(space[2:5]) == genotypes[2:5]
+    assert space[-1] == genotypes[-1]
+
+
+def test_contains():
+    """Test membership without enumerating the space."""
+    space = GenotypeSpace(MUTATIONS, wildtype="AAA")
+    assert "BAC" in space
+    assert "BBC" not in space
+    assert "BA" not in space
+
+
+def test_large_space():
+    """Test ranking in a space too big to enumerate."""
+    mutations = {i: utils.DNA for i in range(30)}
+    space = GenotypeSpace(mutations)
+    assert space.size == 4 ** 30
+
+    genotypes = ["T" * 30, "A" * 29 + "C"]
+    ranks = space.rank(genotypes)
+    assert list(ranks) == [4 ** 30 - 1, 1]
+    assert list(space.unrank(ranks)) == genotypes
+
+    # Single genotypes past 64-bit ranks use Python integers.
+    space = GenotypeSpace({i: utils.DNA for i in range(40)})
+    assert space.size == 4 ** 40
+    genotype = "C" * 40
+    assert space.unrank(space.rank(genotype)) == genotype
+    assert space[-1] == "T" * 40
+    assert space[np.int64(-1)] == "T" * 40
+
+
+def test_missing_ranks():
+    """Test finding unobserved genotypes with a bitmap."""
+    space = GenotypeSpace(MUTATIONS, wildtype="AAA")
+    observed = ["AAB", "BAA", "BAC"]
+
+    bitmap = space.observed_bitmap(observed)
+    assert len(bitmap) == 1
+    assert list(np.unpackbits(bitmap)) == [0, 1, 0, 1, 0, 1, 0, 0]
+    assert list(space.missing_ranks(observed)) == [0, 2, 4]
+    assert list(space.iter_missing(observed, chunksize=8)) == ["AAA", "AAC",
+                                                               "BAB"]
+
+
+def test_iter_chunks():
+    """Test streaming the genotype space in chunks."""
+    space = GenotypeSpace(MUTATIONS, wildtype="AAA")
+    genotypes = utils.mutations_to_genotypes(MUTATIONS, wildtype="AAA")
+
+    chunks = list(space.iter_chunks(chunksize=4))
+    assert [len(c) for c in chunks] == [4, 2]
+    assert list(np.concatenate(chunks)) == genotypes
+
+    chunks = list(space.iter_chunks(chunksize=4, output="bytes"))
+    assert chunks[0].dtype == np.dtype("S3")
+    assert chunks[1].tolist() == [b"BAB", b"BAC"]
+
+    chunks = list(space.iter_chunks(chunksize=4, output="states", start=3))
+    assert chunks[0].tolist() == [[1, 0, 0], [1, 0, 1], [1, 0, 2]]
+
+    assert list(space) == genotypes
@@ -1,6 +1,9 @@
 # Import utils model.
 from gpmap import utils
 
+import numpy as np
+import pytest
+
 WILDTYPE = "AAA"
 
 GENOTYPES = [
@@ -121,6 +124,32 @@ def test_genotypes_to_binary():
     assert lists_are_same(binary, BINARY)
 
 
+def test_get_encoding_table_cache():
+    """Test encoding tables are shared by maps with the same inputs."""
+    utils.clear_encoding_cache()
+    array = utils.get_encoding_array(WILDTYPE, MUTATIONS)
+    assert not array.flags.writeable
+    assert utils.get_encoding_array(WILDTYPE, dict(MUTATIONS)) is array
+    assert utils.get_encoding_array(WILDTYPE, MUTATIONS, [1, 2, 3]) is not array
+
+    # Tables are copies of the cached one, safe to modify.
+    table = utils.get_encoding_table(WILDTYPE, MUTATIONS)
+    table["binary_index_stop"] = 99
+    table = utils.get_encoding_table(WILDTYPE, dict(MUTATIONS))
+    assert table["binary_index_stop"].max() == 3
+    assert utils.encoding_array_to_table(array).equals(table)
+    assert np.array_equal(utils.encoding_table_to_array(table), array)
+    assert list(array["mutation_letter"]) == list(table.mutation_letter)
+    assert np.array_equal(utils.get_encoding_lut(array),
+                          utils.get_encoding_lut(table))
+
+    utils.clear_encoding_cache()
+    assert utils.get_encoding_array(WILDTYPE, MUTATIONS) is not array
+
+    with pytest.raises(ValueError):
+        utils.get_encoding_table(WILDTYPE, MUTATIONS, [1, 2])
+
+
 def test_get_missing_genotypes():
     """Test get_missing_genotypes function."""
     known_, missing_ = GENOTYPES[0:4], GENOTYPES[4:]
@@ -128,3 +157,68 @@ def test_get_missing_genotypes():
     missing = utils.get_missing_genotypes(known_, MUTATIONS)
 
     assert lists_are_same(missing, missing_)
+
+
+def test_pack_binary():
+    """Test packing binary strings into 64-bit words and back."""
+    matrix = utils.binary_to_matrix(BINARY)
+    assert matrix.shape == (8, 3)
+
+    packed = utils.pack_binary(matrix)
+    assert packed.dtype == np.uint64
+    assert packed.shape == (8, 1)
+    assert list(utils.popcount(packed).sum(axis=1)) == [0, 1, 1, 1, 2, 2, 2, 3]
+
+    unpacked = utils.unpack_binary(packed, 3)
+    assert list(utils.matrix_to_binary(unpacked)) == BINARY
+
+
+def test_pack_binary_multiword():
+    """Test packing binary representations longer than one word."""
+    matrix = np.random.randint(0, 2, size=(10, 150)).astype(np.uint8)
+    packed = utils.pack_binary(matrix)
+    assert packed.shape == (10, 3)
+    assert np.array_equal(utils.unpack_binary(packed, 150), matrix)
+    assert np.array_equal(utils.popcount(packed).sum(axis=1),
+                          matrix.sum(axis=1))
+
+
+def test_genotypes_to_binary_matrix():
+    """Test vectorized binary encoding of multi-state genotypes."""
+    mutations = {0: ["A", "B"], 1: ["A", "B", "C"]}
+    encoding_table = utils.get_encoding_table("AA", mutations)
+    matrix = utils.genotypes_to_binary_matrix(["AA", "AC", "BB"],
+                                              encoding_table)
+
+    assert matrix.dtype == np.uint8
+    assert matrix.tolist() == [[0, 0, 0], [0, 0, 1], [1, 1, 0]]
+
+
+def test_genotypes_to_binary_unknown_letter():
+    """Test unknown letters are reported as a ValueError."""
+    encoding_table = utils.get_encoding_table(WILDTYPE, MUTATIONS)
+
+    with pytest.raises(ValueError):
+        utils.genotypes_to_binary(["AAA", "AXA", "BAZ"], encoding_table)
+
+
+def test_genotypes_to_states():
+    """Test integer-coding genotypes by their mutations alphabet."""
+    mutations = {0: ["A", "B"], 1: None, 2: ["C", "A", "B"]}
+    states = utils.genotypes_to_states(["AAC", "BAA", "AAB"], mutations,
+                                       wildtype="AAA")
+
+    assert states.dtype == np.uint8
+    assert states.tolist() == [[0, 0, 0], [1, 0, 1], [0, 0, 2]]
+
+    with pytest.raises(ValueError):
+        utils.genotypes_to_states(["ABA"], mutations, wildtype="AAA")
+
+
+def test_get_missing_genotypes_lazy():
+    """Test lazily decoding missing genotypes."""
+    known_, missing_ = GENOTYPES[0:4], GENOTYPES[4:]
+
+    missing = utils.get_missing_genotypes(known_, MUTATIONS, lazy=True)
+
+    assert lists_are_same(list(missing), missing_)